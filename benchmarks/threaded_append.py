@@ -0,0 +1,44 @@
+"""Benchmark of concurrent producers appending rows to one generator.
+
+Usage::
+
+    python benchmarks/threaded_append.py [rows_per_thread]
+"""
+import sys
+import threading
+import time
+from markdgenerator import PandocMdGenerator
+
+
+def run(n_threads, n_rows, shared_table, thread_safe=True):
+    """Append rows from multiple threads, return the throughput in rows per second."""
+    generator = PandocMdGenerator(thread_safe=thread_safe)
+
+    def produce(thread_id):
+        table_name = 'shared' if shared_table else 'table_{}'.format(thread_id)
+        for i in range(n_rows):
+            generator.add_row([thread_id, i, 'value {}'.format(i)], table_name=table_name)
+            if i % 100 == 0:
+                generator.paragraph('checkpoint {}'.format(i), block_name=table_name)
+
+    threads = [threading.Thread(target=produce, args=(t,)) for t in range(n_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    return n_threads * n_rows / elapsed
+
+
+if __name__ == '__main__':
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    print('single thread, no locks: {:>12,.0f} rows/s'.format(run(1, n_rows, False, thread_safe=False)))
+    for n_threads in (1, 2, 4, 8):
+        for shared_table in (False, True):
+            print('{} threads, {:<8} tables: {:>12,.0f} rows/s'.format(
+                n_threads,
+                'shared' if shared_table else 'separate',
+                run(n_threads, n_rows, shared_table)))
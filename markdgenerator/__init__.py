@@ -6,6 +6,10 @@ from .__about__ import (
     __email__,
 )
 from markdgenerator.pandoc import PandocMdGenerator
+from markdgenerator.github import GithubMdGenerator
+from markdgenerator.rst import RstGenerator
+from markdgenerator.sinks import GzipSink, Bz2Sink, LzmaSink
+from markdgenerator.snapshot import DocumentSnapshot
 from markdgenerator.config import NEWLINE
 import logging
 
@@ -23,5 +27,11 @@ __all__ = [
     "__author__",
     "__email__",
     "PandocMdGenerator",
+    "GithubMdGenerator",
+    "RstGenerator",
+    "GzipSink",
+    "Bz2Sink",
+    "LzmaSink",
+    "DocumentSnapshot",
     "NEWLINE"
 ]
\ No newline at end of file
@@ -0,0 +1,5 @@
+"""Run the command-line interface with ``python -m markdgenerator``."""
+import sys
+from markdgenerator.cli import main
+
+sys.exit(main())
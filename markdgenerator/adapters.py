@@ -0,0 +1,249 @@
+"""Table ingestion adapters.
+
+Every adapter converts a tabular data source to the structure used by the
+tables of the generators, without a pandas round trip:
+a header (list of strings, or None), a list of rows (lists of strings) and
+the column widths. Multi-line cells are split into lines, as described in
+markdgenerator.cells.
+"""
+from collections.abc import Mapping
+import numpy as np
+from markdgenerator.cells import MultiLineRow, split_cell, split_cells, cell_width, cells_widths
+from markdgenerator.config import NEWLINE
+
+
+def _check_header(header):
+    """Stringify a header and split its multi-line cells.
+
+    Args:
+        header(list):
+            header cells
+            (if None) the table has no header
+    Return:
+        list or None
+    """
+    if header is None:
+        return None
+
+    header = [str(c) for c in header]
+    if any([NEWLINE in c for c in header]):
+        header = split_cells(header)
+    return header
+
+
+def _string_column(column):
+    """Measure a column of strings and split its multi-line cells.
+
+    Null cells are written as 'None', the same way as str does in the
+    other adapters. Only columns with newlines are split cell by cell.
+
+    Args:
+        column(list):
+            list of strings, or None for null cells
+    Return:
+        tuple(list, int, boolean): cells, the column width and True if
+        some cells were split into lines
+    """
+    column = ['None' if c is None else c for c in column]
+    if not any([NEWLINE in c for c in column]):
+        return column, max(map(len, column), default=0), False
+
+    column = [split_cell(c) for c in column]
+    return column, max(map(cell_width, column)), True
+
+
+def _columns_to_rows(header, columns, cols_widths, multiline=False):
+    """Transpose already stringified columns to table rows.
+
+    Args:
+        header(list):
+            header cells
+            (if None) the table has no header
+        columns(list):
+            list of columns, each a list of strings
+        cols_widths(list):
+            widths of the cells in the columns
+        multiline(boolean):
+            True if some cells were split into lines
+    Return:
+        tuple(list, list, list): header, rows, column widths
+    """
+    header = _check_header(header)
+    if header is not None:
+        cols_widths = [max(a, b) for a, b in zip(cols_widths, cells_widths(header))]
+
+    if multiline:
+        rows = [MultiLineRow(r) if any([type(c) is tuple for c in r]) else list(r) for r in zip(*columns)]
+    else:
+        rows = [list(r) for r in zip(*columns)]
+    return header, rows, cols_widths
+
+
+def from_rows(rows, header=None):
+    """Get table data from an iterable of row sequences.
+
+    Cells are stringified and the column widths are computed in a single
+    pass over the rows.
+
+    Args:
+        rows(iterable):
+            rows, each a sequence of cells
+        header(list):
+            header cells
+            (if None) the table has no header
+    Return:
+        tuple(list, list, list): header, rows, column widths
+    """
+    header = _check_header(header)
+    cols_widths = cells_widths(header) if header is not None else None
+    str_rows = []
+
+    for row in rows:
+        row = [str(c) for c in row]
+        if any([NEWLINE in c for c in row]):
+            row = split_cells(row)
+
+        if cols_widths is None:
+            cols_widths = cells_widths(row)
+        elif len(cols_widths) != len(row):
+            raise ValueError('Number of cells in the row inconsistent with the number of columns of the table')
+        else:
+            cols_widths = [max(a, b) for a, b in zip(cols_widths, cells_widths(row))]
+        str_rows.append(row)
+
+    return header, str_rows, cols_widths if cols_widths is not None else []
+
+
+def _chain(first, rest):
+    """Yield an already consumed first item and the rest of an iterator."""
+    yield first
+    yield from rest
+
+
+def from_records(records, columns=None):
+    """Get table data from records.
+
+    Args:
+        records(iterable):
+            records, each a sequence of cells or a mapping
+            from column names to cells
+        columns(list):
+            column names, used as the header and, for mappings, to select
+            and order the cells
+            (if None) mappings use the keys of the first record,
+            sequences generate a table without a header
+    Return:
+        tuple(list, list, list): header, rows, column widths
+    """
+    records = iter(records)
+    first = next(records, None)
+    if first is None:
+        return from_rows([], columns)
+
+    if isinstance(first, Mapping):
+        if columns is None:
+            columns = list(first.keys())
+        keys = list(columns)
+        rows = ([r.get(k) for k in keys] for r in _chain(first, records))
+        return from_rows(rows, columns)
+
+    return from_rows(_chain(first, records), columns)
+
+
+def from_numpy(array):
+    """Get table data from a numpy structured array.
+
+    Columns are converted to python scalars and measured column-wise.
+    Cells are stringified from the scalars, the same way as by from_records
+    and df_to_table (e.g. bytes as b'ab', float32 with their full precision).
+
+    Args:
+        array(numpy.ndarray):
+            one-dimensional structured (or record) array of scalar fields,
+            field names are used as the header
+    Return:
+        tuple(list, list, list): header, rows, column widths
+    """
+    if not isinstance(array, np.ndarray) or array.dtype.names is None:
+        raise TypeError('Not a numpy structured array')
+    if array.ndim != 1:
+        raise ValueError('Only one-dimensional structured arrays supported')
+
+    columns = []
+    cols_widths = []
+    multiline = False
+    for name in array.dtype.names:
+        if array[name].ndim > 1:
+            raise ValueError('Subarray field {} not supported'.format(name))
+
+        col, width, is_multiline = _string_column([str(c) for c in array[name].tolist()])
+        columns.append(col)
+        cols_widths.append(width)
+        multiline = multiline or is_multiline
+
+    return _columns_to_rows(list(array.dtype.names), columns, cols_widths, multiline)
+
+
+def from_arrow(data):
+    """Get table data from an Arrow table or record batch.
+
+    Columns are converted to strings with Arrow's vectorized casts,
+    null cells are written as None.
+
+    Args:
+        data(pyarrow.Table or pyarrow.RecordBatch):
+            Arrow data, column names are used as the header
+    Return:
+        tuple(list, list, list): header, rows, column widths
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError('pyarrow is required to ingest Arrow data')
+
+    if not isinstance(data, (pa.Table, pa.RecordBatch)):
+        raise TypeError('Not an Arrow table or record batch')
+
+    columns = []
+    cols_widths = []
+    multiline = False
+    for col in data.columns:
+        try:
+            values = col.cast(pa.string()).to_pylist()
+        except (pa.ArrowNotImplementedError, pa.ArrowInvalid):
+            # types without a string cast (e.g. nested) are stringified by python
+            values = [None if v is None else str(v) for v in col.to_pylist()]
+
+        col, width, is_multiline = _string_column(values)
+        columns.append(col)
+        cols_widths.append(width)
+        multiline = multiline or is_multiline
+
+    return _columns_to_rows(data.column_names, columns, cols_widths, multiline)
+
+
+def from_cursor(cursor, batch_size=1000):
+    """Get table data from an executed DB-API cursor.
+
+    Results are pulled with ``fetchmany`` in batches.
+
+    Args:
+        cursor:
+            DB-API 2.0 cursor with an executed query,
+            column names from its description are used as the header
+        batch_size(int):
+            number of rows fetched at once
+    Return:
+        tuple(list, list, list): header, rows, column widths
+    """
+    if cursor.description is None:
+        raise ValueError('Cursor has no result set')
+
+    def batches():
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            yield from batch
+
+    return from_rows(batches(), [d[0] for d in cursor.description])
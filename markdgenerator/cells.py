@@ -0,0 +1,131 @@
+"""Table cells.
+
+Cells are stored as strings. Cells with newlines are split into lines once,
+when they are added, and stored as tuples of lines; the rows and headers
+containing them are MultiLineRow lists, so that renderers keep a fast path
+for plain single-line rows (``type(row) is list``).
+"""
+from markdgenerator.config import NEWLINE
+
+
+class MultiLineRow(list):
+    """Row or header with at least one multi-line cell."""
+
+    __slots__ = ()
+
+    @property
+    def height(self):
+        """Number of lines of the row."""
+        return max([len(c) if type(c) is tuple else 1 for c in self] or [1])
+
+
+def extra_lines(cells):
+    """Get the number of lines of a row or a header beyond the first one.
+
+    Args:
+        cells(list):
+            row or header
+    Return:
+        int
+    """
+    return 0 if type(cells) is list else cells.height - 1
+
+
+def split_cell(cell):
+    """Split a string cell into its lines.
+
+    Args:
+        cell(str):
+            cell contents
+    Return:
+        str if the cell has a single line, tuple of lines otherwise
+    """
+    if NEWLINE not in cell:
+        return cell
+    lines = cell.replace('\r\n', NEWLINE).split(NEWLINE)
+    return tuple(lines) if len(lines) > 1 else lines[0]
+
+
+def split_cells(cells):
+    """Split the multi-line cells of a row or a header.
+
+    Args:
+        cells(list):
+            list of strings
+    Return:
+        list, or MultiLineRow if any cell has multiple lines
+    """
+    cells = [split_cell(c) for c in cells]
+    return MultiLineRow(cells) if any([type(c) is tuple for c in cells]) else cells
+
+
+def cell_width(cell):
+    """Get the width of a cell, the length of its longest line.
+
+    Args:
+        cell(str or tuple):
+            cell contents
+    Return:
+        int
+    """
+    return len(cell) if type(cell) is str else max(map(len, cell))
+
+
+def cells_widths(cells):
+    """Get the widths of the cells of a row or a header.
+
+    Args:
+        cells(list):
+            row or header
+    Return:
+        list
+    """
+    if type(cells) is list:
+        return [len(c) for c in cells]
+    return [cell_width(c) for c in cells]
+
+
+def cell_line(cell, i):
+    """Get a line of a cell, empty below its last line.
+
+    Args:
+        cell(str or tuple):
+            cell contents
+        i(int):
+            line number
+    Return:
+        str
+    """
+    if type(cell) is str:
+        return cell if i == 0 else ''
+    return cell[i] if i < len(cell) else ''
+
+
+def iter_lines(cells):
+    """Generate the lines of a row or a header, as lists of strings.
+
+    Args:
+        cells(list):
+            row or header
+    Yields:
+        list
+    """
+    if type(cells) is list:
+        yield cells
+    else:
+        for i in range(cells.height):
+            yield [cell_line(c, i) for c in cells]
+
+
+def join_lines(cell, separator):
+    """Join the lines of a cell into a single line.
+
+    Args:
+        cell(str or tuple):
+            cell contents
+        separator(str):
+            string to put between the lines
+    Return:
+        str
+    """
+    return cell if type(cell) is str else separator.join(cell)
@@ -0,0 +1,375 @@
+"""Command-line entry point.
+
+Converts CSV, TSV or JSONL files to tables in bounded memory: a first pass
+over each file computes the column widths, a second pass streams the
+formatted lines to the output.
+"""
+import argparse
+from collections import Counter
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from markdgenerator.__about__ import __version__
+from markdgenerator.adapters import _chain
+from markdgenerator.cells import MultiLineRow, split_cell
+from markdgenerator.config import NEWLINE
+from markdgenerator.github import GithubMdGenerator
+from markdgenerator.pandoc import PandocMdGenerator
+from markdgenerator.rst import RstGenerator
+
+# table formats and the backends rendering them
+FORMATS = {
+    'grid': PandocMdGenerator,
+    'pipe': GithubMdGenerator,
+    'rst': RstGenerator,
+}
+
+# input formats recognized from the file extensions
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+    '.tab': 'tsv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+
+def _input_format(path, input_format=None):
+    """Determine the input format of a file.
+
+    Args:
+        path(str):
+            input file
+        input_format(str):
+            'csv', 'tsv' or 'jsonl'
+            (if None) determined from the file extension
+    Return:
+        str
+    """
+    if input_format is not None:
+        return input_format
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in EXTENSIONS:
+        raise ValueError('Unknown input format of {}, use --input-format'.format(path))
+    return EXTENSIONS[ext]
+
+
+def _jsonl_columns(path, encoding):
+    """Get the column names of a JSONL file, in order of first appearance.
+
+    Args:
+        path(str):
+            input file
+        encoding(str):
+            encoding of the file
+    Return:
+        list
+    """
+    columns = {}
+    with open(path, encoding=encoding) as fp:
+        for i, line in enumerate(fp):
+            if line.strip():
+                for k in _json_object(line, path, i + 1):
+                    columns.setdefault(k, None)
+    return list(columns)
+
+
+def _json_object(line, path, line_number):
+    """Parse a JSONL line holding a record.
+
+    Args:
+        line(str):
+            line of the file
+        path(str):
+            input file
+        line_number(int):
+            number of the line in the file, from 1
+    Return:
+        dict
+    """
+    obj = json.loads(line)
+    if not isinstance(obj, dict):
+        raise ValueError('{}: line {} is not a JSON object'.format(path, line_number))
+    return obj
+
+
+def _iter_records(path, input_format, encoding, columns=None):
+    """Read the records of a file one by one.
+
+    Args:
+        path(str):
+            input file
+        input_format(str):
+            'csv', 'tsv' or 'jsonl'
+        encoding(str):
+            encoding of the file
+        columns(list):
+            column names of a JSONL file
+    Yields:
+        list: cells of a record, for CSV and TSV starting with the header
+    """
+    if input_format == 'jsonl':
+        with open(path, encoding=encoding) as fp:
+            for i, line in enumerate(fp):
+                if line.strip():
+                    obj = _json_object(line, path, i + 1)
+                    yield [obj.get(k) for k in columns]
+    else:
+        delimiter = '\t' if input_format == 'tsv' else ','
+        with open(path, encoding=encoding, newline='') as fp:
+            yield from csv.reader(fp, delimiter=delimiter)
+
+
+def _cell(value, options):
+    """Format a cell value.
+
+    Args:
+        value:
+            cell value
+        options(argparse.Namespace):
+            command-line options
+    Return:
+        str, or tuple of lines for a multi-line cell
+    """
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        value = json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+    if NEWLINE in value or '\r' in value:
+        value = value.replace('\r\n', NEWLINE).replace('\r', NEWLINE)
+        if options.keep_newlines:
+            value = split_cell(value)
+            if options.max_width is not None:
+                value = tuple([l[:options.max_width] for l in value])
+            return value
+        value = value.replace(NEWLINE, options.newline_replacement)
+    if options.max_width is not None and len(value) > options.max_width:
+        value = value[:options.max_width]
+    return value
+
+
+def _row(values, options):
+    """Format the cells of a record.
+
+    Args:
+        values(list):
+            cell values
+        options(argparse.Namespace):
+            command-line options
+    Return:
+        list, or MultiLineRow if any cell has multiple lines
+    """
+    row = [_cell(v, options) for v in values]
+    if options.keep_newlines and any([type(c) is tuple for c in row]):
+        return MultiLineRow(row)
+    return row
+
+
+def _iter_table(path, options):
+    """Read the header and the rows of a file, with formatted cells.
+
+    Args:
+        path(str):
+            input file
+        options(argparse.Namespace):
+            command-line options
+    Return:
+        tuple(list, iterator): header (or None) and the rows
+    """
+    input_format = _input_format(path, options.input_format)
+    columns = None
+    if input_format == 'jsonl':
+        columns = _jsonl_columns(path, options.encoding)
+
+    records = (
+        _row(r, options)
+        for r in _iter_records(path, input_format, options.encoding, columns))
+
+    if input_format == 'jsonl':
+        header = _row(columns, options)
+    else:
+        header = next(records, None)
+
+    if options.no_header:
+        if input_format != 'jsonl' and header is not None:
+            records = _chain(header, records)
+        header = None
+
+    return header, records
+
+
+def convert_file(path, output, options):
+    """Convert a single file to a table.
+
+    Args:
+        path(str):
+            input file
+        output(str):
+            output file
+            (if None) writes to stdout
+        options(argparse.Namespace):
+            command-line options
+    Return:
+        tuple(str, int, float): input file, number of rows, elapsed seconds
+    """
+    start = time.perf_counter()
+
+    backend = FORMATS[options.format]()
+
+    # first pass: column widths, as rendered by the backend
+    header, rows = _iter_table(path, options)
+    cols_widths = backend._cells_widths(header) if header is not None else None
+    rows_count = 0
+    for row in rows:
+        if cols_widths is None:
+            cols_widths = backend._cells_widths(row)
+        elif len(row) != len(cols_widths):
+            raise ValueError('{}: number of cells in row {} inconsistent with the number of columns'.format(
+                path, rows_count + 1))
+        else:
+            cols_widths = [max(a, b) for a, b in zip(cols_widths, backend._cells_widths(row))]
+        rows_count += 1
+    if not cols_widths:
+        raise ValueError('{}: no columns to convert'.format(path))
+    cols_widths = [max(w, options.min_width) for w in cols_widths]
+
+    # second pass: stream the formatted lines
+    header, rows = _iter_table(path, options)
+    lines = backend._iter_table_lines(header, rows, cols_widths)
+    if output is None:
+        for line in lines:
+            sys.stdout.write(line + NEWLINE)
+        sys.stdout.flush()
+    else:
+        with open(output, 'w', encoding='utf-8', newline='') as fp:
+            for line in lines:
+                fp.write(line + NEWLINE)
+
+    return path, rows_count, time.perf_counter() - start
+
+
+def _output_paths(files, output_dir, ext):
+    """Get the output files of the input files.
+
+    Outputs are named after the inputs, without their extension unless
+    it is needed to tell apart inputs with the same name (e.g. d.csv.md
+    and d.tsv.md).
+
+    Args:
+        files(list):
+            input files
+        output_dir(str):
+            output directory
+        ext(str):
+            extension of the output files
+    Return:
+        list
+    """
+    names = [os.path.basename(f) for f in files]
+    stems = [os.path.splitext(n)[0] for n in names]
+    stems_count = Counter(stems)
+    outputs = [os.path.join(output_dir, (s if stems_count[s] == 1 else n) + ext) for s, n in zip(stems, names)]
+
+    inputs = {}
+    for f, o in zip(files, outputs):
+        if o in inputs:
+            raise ValueError('{} and {} would both be written to {}'.format(inputs[o], f, o))
+        inputs[o] = f
+    return outputs
+
+
+def _report(path, rows_count, elapsed):
+    """Log the conversion throughput of a file."""
+    logging.info('%s: %d rows in %.3f s (%.0f rows/s)',
+                 path, rows_count, elapsed, rows_count / elapsed if elapsed > 0 else 0)
+
+
+def build_parser():
+    """Build the command-line argument parser.
+
+    Return:
+        argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog='markdgenerator',
+        description='Convert CSV, TSV or JSONL files to markdown tables.')
+    parser.add_argument('files', nargs='+', help='input files')
+    parser.add_argument('-f', '--format', choices=sorted(FORMATS), default='grid',
+                        help='table format: grid (Pandoc grid table), pipe (GitHub pipe table), '
+                             'rst (reStructuredText grid table); default: grid')
+    parser.add_argument('-i', '--input-format', choices=['csv', 'tsv', 'jsonl'],
+                        help='input format, by default determined from the file extensions')
+    parser.add_argument('-o', '--output-dir',
+                        help='write one file per input into this directory instead of stdout')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of files converted in parallel with --output-dir; default: number of CPUs')
+    parser.add_argument('--no-header', action='store_true',
+                        help='first CSV/TSV line is a row, not a header; JSONL keys are not written')
+    parser.add_argument('--min-width', type=int, default=0,
+                        help='minimal column width')
+    parser.add_argument('--max-width', type=int,
+                        help='maximal column width, longer cells are truncated')
+    parser.add_argument('--newline-replacement', default=' ',
+                        help='replacement of newlines within cells; default: a space')
+    parser.add_argument('--keep-newlines', action='store_true',
+                        help='keep newlines within cells as multi-line grid table cells '
+                             '(joined with <br> in pipe tables)')
+    parser.add_argument('--encoding', default='utf-8',
+                        help='encoding of the input files; default: utf-8')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='do not report conversion throughput')
+    parser.add_argument('--version', action='version', version='%(prog)s ' + __version__)
+    return parser
+
+
+def main(argv=None):
+    """Run the command-line interface.
+
+    Args:
+        argv(list):
+            command-line arguments
+            (if None) uses sys.argv
+    Return:
+        int: exit code
+    """
+    options = build_parser().parse_args(argv)
+    if options.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    ext = '.rst' if options.format == 'rst' else '.md'
+    start = time.perf_counter()
+    total_rows = 0
+    try:
+        if options.output_dir is not None:
+            outputs = _output_paths(options.files, options.output_dir, ext)
+            os.makedirs(options.output_dir, exist_ok=True)
+        else:
+            outputs = [None] * len(options.files)
+
+        if options.output_dir is not None and options.jobs > 1 and len(options.files) > 1:
+            with ProcessPoolExecutor(max_workers=options.jobs) as executor:
+                futures = [executor.submit(convert_file, f, o, options) for f, o in zip(options.files, outputs)]
+                for future in futures:
+                    path, rows_count, elapsed = future.result()
+                    _report(path, rows_count, elapsed)
+                    total_rows += rows_count
+        else:
+            # stdout is written sequentially, tables must not interleave
+            for i, (f, o) in enumerate(zip(options.files, outputs)):
+                if o is None and i > 0:
+                    sys.stdout.write(NEWLINE)
+                path, rows_count, elapsed = convert_file(f, o, options)
+                _report(path, rows_count, elapsed)
+                total_rows += rows_count
+    except (OSError, ValueError, csv.Error) as e:
+        logging.error('%s', e)
+        return 1
+
+    if len(options.files) > 1:
+        _report('total', total_rows, time.perf_counter() - start)
+    return 0
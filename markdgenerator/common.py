@@ -1,29 +1,252 @@
 """General API."""
 from abc import ABC, abstractmethod
 from collections import defaultdict
+import hashlib
+import heapq
+import json
+import os
+import sys
+import threading
+import numpy as np
 import pandas as pd
+from markdgenerator import adapters
+from markdgenerator.cells import MultiLineRow, split_cell, split_cells, cell_width, cells_widths, extra_lines
 from markdgenerator.config import NEWLINE
+from markdgenerator.element import Element
+from markdgenerator.snapshot import DocumentSnapshot
+
+
+class _NoLock:
+    """Do-nothing lock used when thread safety is not requested, or reservation without a budget."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NO_LOCK = _NoLock()
+
+
+class _Reservation:
+    """Bytes reserved in the memory budget, given back if the addition fails."""
+
+    __slots__ = ('generator', 'nbytes')
+
+    def __init__(self, generator, nbytes):
+        """Init function."""
+        self.generator = generator
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is not None:
+            self.generator._release(self.nbytes)
+        return False
+
+
+class _TableEdit:
+    """Lock of a table being edited, charging the counts of cells by length
+    built for the edit to the memory budget once the lock is released."""
+
+    __slots__ = ('generator', 'table_name', 'lock', 'index_size')
+
+    def __init__(self, generator, table_name):
+        """Init function."""
+        self.generator = generator
+        self.table_name = table_name
+        self.lock = generator._lock("table", table_name)
+        self.index_size = 0
+
+    def __enter__(self):
+        self.lock.__enter__()
+        try:
+            table, self.index_size = self.generator._index_widths(self.table_name)
+        except BaseException:
+            self.lock.__exit__(*sys.exc_info())
+            raise
+        return table
+
+    def __exit__(self, *exc_info):
+        self.lock.__exit__(*exc_info)
+        # the budget lock is never taken under the lock of a table
+        if self.index_size:
+            with self.generator._lock("budget", None):
+                self.generator._memory_budget['used'] += self.index_size
+        return False
+
+# bytes of a row in the list of rows of a table, including the list over-allocation
+_ROW_POINTER_SIZE = 16
+# bytes of the lists of a new table
+_NEW_TABLE_SIZE = 3*sys.getsizeof([])
+
+
+def _cells_size(cells, deep=True):
+    """Get the memory used by a list of cells.
+
+    Args:
+        cells(list):
+            list of strings, or tuples of lines for multi-line cells
+        deep(boolean):
+            True if the strings should be counted too
+    Return:
+        int: bytes
+    """
+    size = sys.getsizeof(cells)
+    if deep:
+        size += sum([sys.getsizeof(c) for c in cells])
+        if type(cells) is MultiLineRow:
+            size += sum([sum(map(sys.getsizeof, c)) for c in cells if type(c) is tuple])
+    return size
+
+
+def _cell_size(cell):
+    """Get the memory used by a cell.
+
+    Args:
+        cell(str or tuple):
+            string, or tuple of lines for a multi-line cell
+    Return:
+        int: bytes
+    """
+    size = sys.getsizeof(cell)
+    if type(cell) is tuple:
+        size += sum(map(sys.getsizeof, cell))
+    return size
+
+
+def _rows_size(rows, deep=True):
+    """Get the memory used by a list of rows.
+
+    Args:
+        rows(list):
+            list of lists of strings
+        deep(boolean):
+            True if the strings should be counted too
+    Return:
+        int: bytes
+    """
+    return sys.getsizeof(rows) + sum([_cells_size(r, deep) for r in rows])
+
+
+def _element_size(element, deep=True):
+    """Get the memory used by a block element.
+
+    Args:
+        element(Element):
+            block element
+        deep(boolean):
+            True if the text and the attributes should be counted too
+    Return:
+        int: bytes
+    """
+    size = sys.getsizeof(element)
+    if deep:
+        size += sys.getsizeof(element.text) + sys.getsizeof(element.attributes)
+        size += sum([sys.getsizeof(v) for v in element.attributes.values()])
+    return size
+
+
+def _table_size(table, deep=True):
+    """Get the memory used by the parts of a table.
+
+    Args:
+        table(dict):
+            table with all its elements
+        deep(boolean):
+            True if the strings and numbers should be counted too
+    Return:
+        dict: bytes of the header, the rows and the column widths,
+        including the counts of cells by length
+    """
+    return {
+        'header': _cells_size(table['header'], deep),
+        'rows': _rows_size(table['rows'], deep),
+        'widths': _cells_size(table['cols_widths'], deep) + _widths_index_size(table)}
+
+
+def _widths_index_size(table):
+    """Get the memory used by the counts of cells by length of a table.
+
+    Args:
+        table(dict):
+            table with all its elements
+    Return:
+        int: bytes, 0 if the counts are not built
+    """
+    if table.get('widths_counts') is None:
+        return 0
+
+    return _cells_size(table['widths_counts'], False) + _cells_size(table['widths_heaps'], False) + \
+        sum([sys.getsizeof(counts) for counts in table['widths_counts']]) + \
+        sum([sys.getsizeof(heap) for heap in table['widths_heaps']])
 
 
 class CommonMdGenerator(ABC):
-    """Common (abstract) parent class to generate text in markdown languages with."""
+    """Common (abstract) parent class to generate text in markdown languages with.
+
+    Args:
+        thread_safe(boolean):
+            True if multiple threads add elements to the generator concurrently;
+            every block, table and section is then guarded by its own lock
+    """
 
-    def __init__(self):
+    def __init__(self, thread_safe=False):
         """Init function."""
         self._blocks = defaultdict(list)
         self._tables = defaultdict(list)
         self._sections = defaultdict(list)
         self._last_element = None
+        # modification counters of blocks and tables, keyed by (type, name)
+        self._versions = defaultdict(int)
+        # rendered sections of this backend, keyed by section name
+        self._rendered_sections = {}
+        # per block/table/section locks, keyed by (type, name)
+        self._thread_safe = thread_safe
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        # memory budget shared with the backend views
+        self._memory_budget = {'limit': None, 'on_exceed': None, 'used': 0}
 
 
+    def as_backend(self, backend):
+        """Get a generator of another backend sharing the same contents.
+
+        Elements are stored unformatted, so the document is built once and
+        every additional backend only pays for formatting at render time.
+
+        Args:
+            backend(type):
+                CommonMdGenerator subclass to render with,
+                e.g. GithubMdGenerator or RstGenerator
+
+        Return:
+            CommonMdGenerator
+        """
+        if not (isinstance(backend, type) and issubclass(backend, CommonMdGenerator)):
+            raise TypeError('Not a CommonMdGenerator subclass')
+
+        view = backend(thread_safe=self._thread_safe)
+        view._blocks = self._blocks
+        view._tables = self._tables
+        view._sections = self._sections
+        view._versions = self._versions
+        view._locks = self._locks
+        view._locks_guard = self._locks_guard
+        view._memory_budget = self._memory_budget
+        view._last_element = self._last_element
+        return view
+
     def __str__(self):
         """Get string representation."""
         if(len(self._sections)):
-            return NEWLINE.join([self.render_section(s) for s in self._sections])
+            return NEWLINE.join([self.render_section(s) for s in list(self._sections)])
         elif(len(self._blocks)):
-            return NEWLINE.join([self.render_block(b) for b in self._blocks])
+            return NEWLINE.join([self.render_block(b) for b in list(self._blocks)])
         elif(len(self._tables)):
-            return NEWLINE.join([self.render_table(t) for t in self._tables])
+            return NEWLINE.join([self.render_table(t) for t in list(self._tables)])
         else:
             return ''
 
@@ -36,7 +259,16 @@ class CommonMdGenerator(ABC):
                 block to flush
                 (if None) uses the default block
         """
-        self._blocks[block_name] = []
+        freed = 0
+        with self._lock("block", block_name):
+            if self._memory_budget['limit'] is not None and block_name in self._blocks:
+                block = self._blocks[block_name]
+                freed = sys.getsizeof(block) + sum([_element_size(el) for el in block])
+            self._blocks[block_name] = []
+            self._touch("block", block_name)
+
+        if freed:
+            self._release(freed)
 
     def _flush_table(self, table_name=None):
         """Flush a table.
@@ -46,13 +278,27 @@ class CommonMdGenerator(ABC):
                 table to flush
                 (if None) uses the default table
         """
-        self._tables[table_name] = {
-            'header': [],
-            'rows': [],
-            'cols_count': 0,
-            'cols_widths': [],
-            'rows_count': 0,
-            'has_header': False}
+        freed = 0
+        with self._lock("table", table_name):
+            if self._memory_budget['limit'] is not None and table_name in self._tables:
+                freed = sum(_table_size(self._tables[table_name]).values())
+            self._tables[table_name] = {
+                'header': [],
+                'rows': [],
+                'cols_count': 0,
+                'cols_widths': [],
+                'rows_count': 0,
+                # lines of the multi-line rows and header beyond their first one
+                'extra_lines': 0,
+                'has_header': False,
+                # per column counts of cells by length and heaps of
+                # these lengths, built on the first edit
+                'widths_counts': None,
+                'widths_heaps': None}
+            self._touch("table", table_name)
+
+        if freed:
+            self._release(freed)
 
     def _flush_section(self, section_name=None):
         """Flush a section.
@@ -66,20 +312,68 @@ class CommonMdGenerator(ABC):
                 (if None) uses the default section
 
         """
-        self._sections[section_name] = []
+        freed = 0
+        with self._lock("section", section_name):
+            if self._memory_budget['limit'] is not None and section_name in self._sections:
+                section = self._sections[section_name]
+                freed = sys.getsizeof(section) + sum([sys.getsizeof(el) for el in section])
+            self._sections[section_name] = []
+
+        if freed:
+            self._release(freed)
+
+    def _lock(self, element_type, name):
+        """Get the lock guarding a block, a table or a section.
+
+        Args:
+            element_type(str):
+                "block", "table" or "section"
+            name(str):
+                name of the block, table or section
+
+        Return:
+            context manager, a no-op one if the generator is not thread safe
+        """
+        if not self._thread_safe:
+            return _NO_LOCK
+
+        key = (element_type, name)
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(key, threading.RLock())
+        return lock
+
+    def _touch(self, element_type, name):
+        """Mark a block or a table as modified.
+
+        Args:
+            element_type(str):
+                "block" or "table"
+            name(str):
+                name of the modified block or table
+        """
+        self._versions[(element_type, name)] += 1
 
-    def _add_to_block(self, block_name, text):
-        """Add the formatted text to a given block.
+    def _add_to_block(self, block_name, element):
+        """Add an element to a given block.
 
         Args:
             block_name(str):
                 block to write to
                 (if None) uses the default block
-            text(str):
-                formatted string to write
+            element(Element):
+                unformatted element to write
         """
-        # append to the block the formatted text
-        self._blocks[block_name].append(text)
+        # append the element to the block, formatting is done when rendering
+        if self._memory_budget['limit'] is None and not self._thread_safe:
+            self._blocks[block_name].append(element)
+            self._touch("block", block_name)
+        else:
+            with self._reserve(lambda: _element_size(element) + _ROW_POINTER_SIZE), \
+                    self._lock("block", block_name):
+                self._blocks[block_name].append(element)
+                self._touch("block", block_name)
 
         # declare it to be the element used last
         self._last_element = block_name
@@ -103,7 +397,7 @@ class CommonMdGenerator(ABC):
                 err_msg = f"Table {table_name} not existing"
             raise ValueError(err_msg)
 
-        self._sections[section_name].append({"type": "table", "name": table_name})
+        self._add_to_section(section_name, {"type": "table", "name": table_name})
 
     def add_block_to_section(self, block_name=None, section_name=None):
         """Add a block to a section.
@@ -124,7 +418,23 @@ class CommonMdGenerator(ABC):
                 err_msg = f"Block{block_name} not existing"
             raise ValueError(err_msg)
 
-        self._sections[section_name].append({"type": "block", "name": block_name})
+        self._add_to_section(section_name, {"type": "block", "name": block_name})
+
+    def _add_to_section(self, section_name, component):
+        """Add a component to a given section.
+
+        Args:
+            section_name(str):
+                section to add to
+                (if None) uses the default section
+            component(dict):
+                type ("block" or "table") and name of the component
+        """
+        size_func = lambda: sys.getsizeof(component) + _ROW_POINTER_SIZE + \
+            (0 if section_name in self._sections else sys.getsizeof([]))
+
+        with self._reserve(size_func), self._lock("section", section_name):
+            self._sections[section_name].append(component)
 
     def h1(self, text, block_name=None):
         """Add a h1 title to a block.
@@ -138,7 +448,7 @@ class CommonMdGenerator(ABC):
         """
         self._add_to_block(
             block_name=block_name,
-            text=self._h1(text)
+            element=Element('h1', text)
         )
 
     @abstractmethod
@@ -165,7 +475,7 @@ class CommonMdGenerator(ABC):
         """
         self._add_to_block(
             block_name=block_name,
-            text=self._h2(text)
+            element=Element('h2', text)
         )
 
     @abstractmethod
@@ -192,7 +502,7 @@ class CommonMdGenerator(ABC):
         """
         self._add_to_block(
             block_name=block_name,
-            text=self._h3(text)
+            element=Element('h3', text)
         )
 
     @abstractmethod
@@ -219,7 +529,7 @@ class CommonMdGenerator(ABC):
         """
         self._add_to_block(
             block_name=block_name,
-            text=self._paragraph(text)
+            element=Element('paragraph', text)
         )
 
     @abstractmethod
@@ -234,7 +544,7 @@ class CommonMdGenerator(ABC):
         """
         pass
 
-    def codeparagraph(self, text, block_name=None):
+    def codeparagraph(self, text, block_name=None, language=None):
         """Add a codeparagraph to a block.
 
         Args:
@@ -243,24 +553,44 @@ class CommonMdGenerator(ABC):
             block_name(str):
                 block to write to
                 (if None) uses the default block
+            language(str):
+                language of the code, used for syntax highlighting
+                (if None) no language is declared
         """
+        attributes = {'language': language} if language is not None else None
         self._add_to_block(
             block_name=block_name,
-            text=self._codeblock(text)
+            element=Element('codeblock', text, attributes)
         )
 
     @abstractmethod
-    def _codeblock(self, text):
+    def _codeblock(self, text, language=None):
         """Generate markdown codeparagraph.
 
         Args:
             text(str):
                 string to write
+            language(str):
+                language of the code
+                (if None) no language is declared
         Returns:
             str
         """
         pass
 
+    def _render_element(self, element):
+        """Format a block element with this backend.
+
+        Args:
+            element(Element):
+                element to format
+
+        Return:
+            str
+        """
+        # elements are formatted by the backend method named after their kind
+        return getattr(self, '_' + element.kind)(element.text, **element.attributes)
+
     def render_block(self, block_name=None):
         """Get the markdown string of a block.
 
@@ -272,7 +602,8 @@ class CommonMdGenerator(ABC):
         Return:
             str
         """
-        return self._render_block(self._blocks[block_name])
+        with self._lock("block", block_name):
+            return self._render_block(self._blocks[block_name])
 
     @abstractmethod
     def _render_block(self, block):
@@ -280,7 +611,7 @@ class CommonMdGenerator(ABC):
 
         Args:
             block(list):
-                list of strings corresponding to block elements
+                list of Element objects of the block
 
         Return:
             str
@@ -298,7 +629,188 @@ class CommonMdGenerator(ABC):
         Return:
             str
         """
-        return self._render_section(self._sections[section_name])
+        with self._lock("section", section_name):
+            section = list(self._sections[section_name])
+        return self._render_section(section)
+
+    def _render_section_cached(self, section_name):
+        """Get the markdown string and digest of a section, reusing previous work.
+
+        A section is rendered and hashed again only if one of its blocks or
+        tables was modified since the last call.
+
+        Args:
+            section_name(str):
+                section to render
+
+        Return:
+            tuple(str, str)
+        """
+        with self._lock("section", section_name):
+            section = list(self._sections[section_name])
+        key = tuple((el['type'], el['name'], self._versions[(el['type'], el['name'])]) for el in section)
+
+        cached = self._rendered_sections.get(section_name)
+        if cached is None or cached[0] != key:
+            text = self._render_section(section)
+            digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+            cached = (key, text, digest)
+            self._rendered_sections[section_name] = cached
+
+        return cached[1], cached[2]
+
+    def write_document(self, path, incremental=True, encoding='utf-8'):
+        """Write the markdown string of the whole document to a file.
+
+        A sidecar manifest ``<path>.manifest.json`` keeps the digest of the
+        whole document, derived from the digests of its sections, and the
+        encoding of the file. In incremental mode, sections whose blocks and
+        tables did not change since the previous write are not rendered
+        again, and the file is not written at all if both the digest and the
+        encoding match the manifest.
+
+        Args:
+            path(str):
+                file to write to
+            incremental(boolean):
+                True if an unchanged document should not be written again
+            encoding(str):
+                encoding of the written file
+
+        Return:
+            boolean: True if the file was written
+        """
+        path = os.fspath(path)
+        manifest_path = path + '.manifest.json'
+
+        # render the document by parts, the same way as __str__ does
+        if len(self._sections):
+            parts = [self._render_section_cached(s) for s in list(self._sections)]
+        else:
+            text = str(self)
+            parts = [(text, hashlib.sha256(text.encode('utf-8')).hexdigest())]
+
+        # the document digest is derived from the digests of its parts
+        document_digest = hashlib.sha256(
+            NEWLINE.join([digest for (_, digest) in parts]).encode('ascii')).hexdigest()
+
+        if incremental and os.path.exists(path) and os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, encoding='utf-8') as fp:
+                    manifest = json.load(fp)
+            except ValueError:
+                manifest = {}
+            if manifest.get('document') == document_digest and manifest.get('encoding') == encoding:
+                return False
+
+        with open(path, 'w', encoding=encoding, newline='') as fp:
+            fp.write(NEWLINE.join([text for (text, _) in parts]))
+
+        manifest = {'document': document_digest, 'encoding': encoding}
+        with open(manifest_path, 'w', encoding='utf-8') as fp:
+            json.dump(manifest, fp, indent=1)
+
+        return True
+
+    def render_to(self, stream):
+        """Write the markdown string of the whole document to a text stream.
+
+        The document is produced chunk by chunk, tables line by line, so it
+        is never held in memory as a whole. Combined with a compressed sink
+        (e.g. markdgenerator.sinks.GzipSink), it archives large documents in
+        bounded memory.
+
+        Args:
+            stream:
+                object with a write(str) method, e.g. a text file or a sink
+        """
+        for chunk in self._iter_document():
+            stream.write(chunk)
+
+    def freeze(self):
+        """Get an immutable pre-rendered snapshot of the document.
+
+        The snapshot holds the UTF-8 bytes of the rendered document and of
+        the blocks and tables outside of it, with an index of their byte
+        ranges. It can be published to shared memory or to a memory-mapped
+        file and attached by other processes without copying or rendering.
+
+        Names of sections, blocks and tables must be strings, numbers, dates
+        or None, as Python, numpy or pandas scalars (e.g. the Timestamp keys
+        of a datetime groupby), or tuples of them. A TypeError is raised
+        otherwise.
+
+        Return:
+            DocumentSnapshot
+        """
+        return DocumentSnapshot.from_generator(self)
+
+    def _iter_document(self):
+        """Generate the markdown string of the whole document chunk by chunk.
+
+        Joined together, the chunks are equal to str(self).
+
+        Yields:
+            str
+        """
+        if(len(self._sections)):
+            names, iter_part = list(self._sections), self._iter_section
+        elif(len(self._blocks)):
+            names, iter_part = list(self._blocks), lambda b: iter((self.render_block(b),))
+        else:
+            names, iter_part = list(self._tables), self._iter_table
+
+        for i, name in enumerate(names):
+            if i:
+                yield NEWLINE
+            yield from iter_part(name)
+
+    def _iter_section(self, section_name=None):
+        """Generate the markdown string of a section chunk by chunk.
+
+        Args:
+            section_name(str):
+                section to render
+                (if None) renders the default section
+        Yields:
+            str
+        """
+        with self._lock("section", section_name):
+            section = list(self._sections[section_name])
+
+        for i, el in enumerate(section):
+            if i:
+                yield NEWLINE
+            if el['type'] == "table":
+                yield from self._iter_table(el['name'])
+            else:
+                yield self.render_block(el['name'])
+
+    def _iter_table(self, table_name=None):
+        """Generate the markdown string of a table line by line.
+
+        In thread safe mode, the table is rendered from a snapshot of its
+        list of rows, taken under its lock, so that a slow consumer does not
+        block the producers of the table. Rows are never modified in place,
+        the snapshot only holds a reference per row. Otherwise the rows are
+        read directly and the table must not be modified while it is
+        rendered.
+
+        Args:
+            table_name(str):
+                table to render
+                (if None) renders the default table
+        Yields:
+            str
+        """
+        with self._lock("table", table_name):
+            table = self._tables[table_name]
+            header = table['header'] if table['has_header'] else None
+            rows = list(table['rows']) if self._thread_safe else table['rows']
+            cols_widths = list(self._rendered_widths(header, rows, table['cols_widths']))
+
+        for line in self._iter_table_lines(header, rows, cols_widths):
+            yield line + NEWLINE
 
     @abstractmethod
     def _render_section(self, section):
@@ -324,7 +836,8 @@ class CommonMdGenerator(ABC):
         Return:
             str
         """
-        return self._render_table(self._tables[table_name])
+        with self._lock("table", table_name):
+            return self._render_table(self._tables[table_name])
 
     @abstractmethod
     def _render_table(self, table):
@@ -338,6 +851,52 @@ class CommonMdGenerator(ABC):
         """
         pass
 
+    @abstractmethod
+    def _iter_table_lines(self, header, rows, cols_widths):
+        """Generate the lines of a table one by one.
+
+        Args:
+            header(list):
+                header cells
+                (if None) the table has no header
+            rows(iterable):
+                rows, each a list of strings
+            cols_widths(list):
+                widths of the columns
+        Yields:
+            str
+        """
+        pass
+
+    def _cells_widths(self, cells):
+        """Get the widths of the cells of a row or a header as rendered.
+
+        Args:
+            cells(list):
+                row or header
+        Return:
+            list
+        """
+        return cells_widths(cells)
+
+    def _rendered_widths(self, header, rows, cols_widths):
+        """Get the widths of the columns of a table as rendered.
+
+        Backends rendering the cells as they are keep the widths of the table.
+
+        Args:
+            header(list):
+                header cells
+                (if None) the table has no header
+            rows(list):
+                rows, each a list of strings, or a MultiLineRow
+            cols_widths(list):
+                widths of the cells of the columns
+        Return:
+            list
+        """
+        return cols_widths
+
     def add_header(self, header, table_name=None):
         """Add a header to a table.
 
@@ -351,34 +910,40 @@ class CommonMdGenerator(ABC):
         # convert to strings
         header = [str(c) for c in header]
 
-        # new lines not yet supported
+        # multi-line cells are split into lines once
         if any([NEWLINE in c for c in header]):
-            raise ValueError('Multi-lines cells not yet supported')
+            header = split_cells(header)
 
-        # if table not yet existing, create it
-        if table_name not in self._tables:
-            self._flush_table(table_name)
+        size_func = lambda: _cells_size(header) + (0 if table_name in self._tables else _NEW_TABLE_SIZE)
 
-        # check whether the additon is consistent with the table
-        if self._tables[table_name]['has_header']:
-            raise ValueError('Header already added')
+        with self._reserve(size_func), self._lock("table", table_name):
+            # if table not yet existing, create it
+            if table_name not in self._tables:
+                self._flush_table(table_name)
 
-        if self._tables[table_name]['cols_count'] != 0 and self._tables[table_name]['cols_count'] != len(header):
-            raise ValueError('Number of cells in the header inconsistent with the number of columns of the table')
+            # check whether the additon is consistent with the table
+            if self._tables[table_name]['has_header']:
+                raise ValueError('Header already added')
 
-        # update the column widths
-        if self._tables[table_name]['rows_count'] > 0:
-            # some rows are already in the table, update the widths
-            self._tables[table_name]['cols_widths'] = [max(a, b) for a, b in \
-                zip(self._tables[table_name]['cols_widths'], [len(h) for h in header])]
-        else:
-            # no rows yet, define the widths from the header
-            self._tables[table_name]['cols_widths'] = [len(h) for h in header]
+            if self._tables[table_name]['cols_count'] != 0 and self._tables[table_name]['cols_count'] != len(header):
+                raise ValueError('Number of cells in the header inconsistent with the number of columns of the table')
 
-        # all OK, add the header
-        self._tables[table_name]['header'] = header
-        self._tables[table_name]['has_header'] = True
-        self._tables[table_name]['cols_count'] = len(header)
+            # update the column widths
+            if self._tables[table_name]['rows_count'] > 0:
+                # some rows are already in the table, update the widths
+                self._tables[table_name]['cols_widths'] = [max(a, b) for a, b in \
+                    zip(self._tables[table_name]['cols_widths'], cells_widths(header))]
+            else:
+                # no rows yet, define the widths from the header
+                self._tables[table_name]['cols_widths'] = cells_widths(header)
+
+            # all OK, add the header
+            self._tables[table_name]['header'] = header
+            self._tables[table_name]['has_header'] = True
+            self._tables[table_name]['cols_count'] = len(header)
+            self._tables[table_name]['extra_lines'] += extra_lines(header)
+            self._count_widths(self._tables[table_name], header, 1)
+            self._touch("table", table_name)
 
         # declare it to be the element used last
         self._last_element = table_name
@@ -397,31 +962,278 @@ class CommonMdGenerator(ABC):
         # convert to strings
         row = [str(c) for c in row]
 
-        # new lines not yet supported
+        # multi-line cells are split into lines once
         if any([NEWLINE in c for c in row]):
-            raise ValueError('Multi-lines cells not yet supported')
+            row = split_cells(row)
+
+        # plain generators append directly, without any budget or lock context
+        if self._memory_budget['limit'] is None and not self._thread_safe:
+            self._append_row(row, table_name)
+        else:
+            size_func = lambda: _cells_size(row) + _ROW_POINTER_SIZE + \
+                (0 if table_name in self._tables else _NEW_TABLE_SIZE)
+            with self._reserve(size_func), self._lock("table", table_name):
+                self._append_row(row, table_name)
 
+        # declare it to be the element used last
+        self._last_element = table_name
+
+    def _append_row(self, row, table_name):
+        """Append a row to a table, the caller holds the lock of the table.
+
+        Args:
+            row(list):
+                list of strings, or a MultiLineRow
+            table_name(str):
+                table to add the row to
+                (if None) uses the default table
+        """
         # if table not yet existing, create it
         if table_name not in self._tables:
             self._flush_table(table_name)
+        table = self._tables[table_name]
 
         # check whether the additon is consistent with the table
-        if self._tables[table_name]['cols_count'] != 0 and self._tables[table_name]['cols_count'] != len(row):
+        if table['cols_count'] != 0 and table['cols_count'] != len(row):
             raise ValueError('Number of cells in the row inconsistent with the number of columns of the table')
 
         # update the column widths
-        if  self._tables[table_name]['has_header'] or self._tables[table_name]['rows_count']>0:
+        widths = [len(c) for c in row] if type(row) is list else cells_widths(row)
+        if table['has_header'] or table['rows_count'] > 0:
             # header or some rows are already in the table, update the widths
-            self._tables[table_name]['cols_widths'] = [max(a,b) for a,b in \
-                zip(self._tables[table_name]['cols_widths'], [len(c) for c in row])]
+            table['cols_widths'] = [max(a, b) for a, b in zip(table['cols_widths'], widths)]
         else:
             # no rows/header yet, define the widths from this row
-            self._tables[table_name]['cols_widths'] = [len(c) for c in row]
+            table['cols_widths'] = widths
 
         # all OK, add the row
-        self._tables[table_name]['rows'].append(row)
-        self._tables[table_name]['cols_count'] = len(row)
-        self._tables[table_name]['rows_count'] += 1
+        table['rows'].append(row)
+        table['cols_count'] = len(row)
+        table['rows_count'] += 1
+        if type(row) is not list:
+            table['extra_lines'] += row.height - 1
+        if table['widths_counts'] is not None:
+            self._count_widths(table, row, 1)
+        # mark the table as modified, as _touch does
+        self._versions[("table", table_name)] += 1
+
+    def _count_widths(self, table, cells, increment):
+        """Update the per column counts of cells by length, if already built.
+
+        Args:
+            table(dict):
+                table with all its elements
+            cells(list):
+                cells of a header or a row
+            increment(int):
+                1 if the cells are added, -1 if they are removed
+        Return:
+            list: columns left without any cell of the length of a removed one
+        """
+        if table['widths_counts'] is None:
+            return []
+
+        return [i for i, w in enumerate(cells_widths(cells)) if self._count_width(table, i, w, increment)]
+
+    def _count_width(self, table, col_index, width, increment):
+        """Update the count of cells of a length in a column.
+
+        Lengths without cells so far are pushed on the heap of the column.
+
+        Args:
+            table(dict):
+                table with all its elements
+            col_index(int):
+                position of the column
+            width(int):
+                length of the cell
+            increment(int):
+                1 if the cell is added, -1 if it is removed
+        Return:
+            boolean: True if no cell of the length is left in the column
+        """
+        counts = table['widths_counts'][col_index]
+        count = counts.get(width, 0) + increment
+        if count > 0:
+            counts[width] = count
+            if count == 1 and increment > 0:
+                heapq.heappush(table['widths_heaps'][col_index], -width)
+            return False
+
+        del counts[width]
+        return True
+
+    def _edit_table(self, table_name):
+        """Lock a table to edit, with its counts of cells by length built.
+
+        The counts are built by a single scan on the first edit of a table,
+        appending rows does not need them. They are accounted to the memory
+        budget once built, without spilling, after the lock of the table is
+        released.
+
+        Args:
+            table_name(str):
+                table to edit
+                (if None) uses the default table
+        Return:
+            context manager, giving the table as a dict
+        """
+        return _TableEdit(self, table_name)
+
+    def _index_widths(self, table_name):
+        """Build the counts of cells by length of a table, if not yet built.
+
+        Args:
+            table_name(str):
+                table to edit
+                (if None) uses the default table
+        Return:
+            tuple(dict, int), the table and the bytes of the counts built
+            for it, to account to the memory budget
+        """
+        if table_name not in self._tables:
+            if table_name is None:
+                err_msg = "Default table not yet used"
+            else:
+                err_msg = f"Table {table_name} not existing"
+            raise ValueError(err_msg)
+
+        table = self._tables[table_name]
+        if table['widths_counts'] is None:
+            table['widths_counts'] = [{} for _ in range(table['cols_count'])]
+            table['widths_heaps'] = [[] for _ in range(table['cols_count'])]
+            if table['has_header']:
+                self._count_widths(table, table['header'], 1)
+            for r in table['rows']:
+                self._count_widths(table, r, 1)
+
+            if self._memory_budget['limit'] is not None:
+                return table, _widths_index_size(table)
+        return table, 0
+
+    def _shrink_widths(self, table, columns):
+        """Lower the widths of columns to the longest cells left after an edit.
+
+        Every column keeps a max-heap of the lengths of its cells. Lengths
+        without cells left are popped lazily, once they reach the top, and
+        the heap is rebuilt from the counts when more than half of it is
+        stale. Every pushed length is thus popped at most once, the cost of
+        an edit is amortized O(1) per column, whatever the widths.
+
+        Args:
+            table(dict):
+                table with all its elements
+            columns(list):
+                positions of the columns left without any cell of a length
+        """
+        for i in columns:
+            counts = table['widths_counts'][i]
+            heap = table['widths_heaps'][i]
+            if len(heap) > 2*len(counts) + 1:
+                heap[:] = [-w for w in counts]
+                heapq.heapify(heap)
+
+            while heap and -heap[0] not in counts:
+                heapq.heappop(heap)
+            table['cols_widths'][i] = -heap[0] if heap else 0
+
+    def update_row(self, index, row, table_name=None):
+        """Replace a row of a table.
+
+        Args:
+            index(int):
+                position of the row, negative positions count from the end
+            row(str[]):
+                list of strings
+            table_name(str):
+                table to update
+                (if None) uses the default table
+        """
+        # convert to strings
+        row = [str(c) for c in row]
+
+        # multi-line cells are split into lines once
+        if any([NEWLINE in c for c in row]):
+            row = split_cells(row)
+
+        with self._reserve(lambda: _cells_size(row)), self._edit_table(table_name) as table:
+            if table['cols_count'] != len(row):
+                raise ValueError('Number of cells in the row inconsistent with the number of columns of the table')
+
+            old_row = table['rows'][index]
+            table['rows'][index] = row
+            table['extra_lines'] += extra_lines(row) - extra_lines(old_row)
+            emptied = self._count_widths(table, old_row, -1)
+            self._count_widths(table, row, 1)
+            table['cols_widths'] = [max(a, b) for a, b in zip(table['cols_widths'], cells_widths(row))]
+            self._shrink_widths(table, emptied)
+            self._touch("table", table_name)
+
+        if self._memory_budget['limit'] is not None:
+            self._release(_cells_size(old_row))
+
+        # declare it to be the element used last
+        self._last_element = table_name
+
+    def delete_row(self, index, table_name=None):
+        """Delete a row of a table.
+
+        Args:
+            index(int):
+                position of the row, negative positions count from the end
+            table_name(str):
+                table to delete the row from
+                (if None) uses the default table
+        """
+        with self._edit_table(table_name) as table:
+
+            old_row = table['rows'].pop(index)
+            table['rows_count'] -= 1
+            table['extra_lines'] -= extra_lines(old_row)
+            self._shrink_widths(table, self._count_widths(table, old_row, -1))
+            self._touch("table", table_name)
+
+        if self._memory_budget['limit'] is not None:
+            self._release(_cells_size(old_row) + _ROW_POINTER_SIZE)
+
+        # declare it to be the element used last
+        self._last_element = table_name
+
+    def set_cell(self, row_index, col_index, value, table_name=None):
+        """Replace a single cell of a table.
+
+        Args:
+            row_index(int):
+                position of the row, negative positions count from the end
+            col_index(int):
+                position of the column, negative positions count from the end
+            value(str):
+                new contents of the cell
+            table_name(str):
+                table to update
+                (if None) uses the default table
+        """
+        # convert to string, multi-line cells are split into lines once
+        value = split_cell(str(value))
+
+        with self._reserve(lambda: _cell_size(value)), self._edit_table(table_name) as table:
+            # the row is copied, rows are never modified in place
+            row = table['rows'][row_index]
+            row = MultiLineRow(row) if type(value) is tuple or type(row) is not list else list(row)
+            old_value = row[col_index]
+            row[col_index] = value
+            table['extra_lines'] += extra_lines(row) - extra_lines(table['rows'][row_index])
+            table['rows'][row_index] = row
+
+            emptied = self._count_width(table, col_index, cell_width(old_value), -1)
+            self._count_width(table, col_index, cell_width(value), 1)
+            table['cols_widths'][col_index] = max(table['cols_widths'][col_index], cell_width(value))
+            if emptied:
+                self._shrink_widths(table, [col_index])
+            self._touch("table", table_name)
+
+        if self._memory_budget['limit'] is not None:
+            self._release(_cell_size(old_value))
 
         # declare it to be the element used last
         self._last_element = table_name
@@ -430,6 +1242,9 @@ class CommonMdGenerator(ABC):
                     replace_newlines=False, replace_with='; '):
         """Generate a full table for a given pandas dataframe.
 
+        Cells with newlines become multi-line cells, unless the newlines
+        are replaced.
+
         Args:
             df(pandas.core.frame.DataFrame):
                 dataframe
@@ -441,27 +1256,395 @@ class CommonMdGenerator(ABC):
             replace_with(str):
                 what to replace newline char with
         """
-        if table_name in self._tables:
-            raise ValueError('Table under {} already existing'.format(table_name))
+        # rows of the dataframe are kept together, even with concurrent producers
+        with self._lock("table", table_name):
+            if table_name in self._tables:
+                raise ValueError('Table under {} already existing'.format(table_name))
+
+            # convert cells to strings and measure them, column by column
+            header, df_s = self._stringify_frame(df, replace_newlines, replace_with)
+            rows, lengths = self._frame_rows(df_s)
+
+            cols_widths = cells_widths(header)
+            if len(rows):
+                cols_widths = [max(a, int(b)) for a, b in zip(cols_widths, lengths.max().tolist())]
+            self._data_to_table((header, rows, cols_widths), table_name)
+
+        # declare it to be the element used last
+        self._last_element = table_name
+
+    def _stringify_frame(self, df, replace_newlines=False, replace_with='; '):
+        """Convert all cells of a dataframe to stripped strings at once.
+
+        Args:
+            df(pandas.core.frame.DataFrame):
+                dataframe
+            replace_newlines(boolean):
+                True if newline char should be replaced
+            replace_with(str):
+                what to replace newline char with
+        Return:
+            tuple(list, pandas.core.frame.DataFrame): header, with multi-line
+            cells split, and the stringified dataframe
+        """
         if not isinstance(df, pd.core.frame.DataFrame):
             raise TypeError('Not a pandas dataframe')
         if isinstance(df.columns, pd.core.indexes.multi.MultiIndex):
             raise ValueError('Multi-index columns not supported')
 
-        # convert cells to strings
-        df_s = df.applymap(str)
+        # replace function, applied to the header cells
+        rep = lambda x : x.replace('\r\n',NEWLINE) if not replace_newlines else x.replace('\r\n',NEWLINE).replace(NEWLINE,replace_with)
+        header = split_cells([rep(str(c)).strip() for c in df.columns])
+
+        # convert cells to strings and normalize newlines, column by column
+        df_s = df.applymap(str).astype(object)
+        if len(df_s.index):
+            df_s = df_s.apply(lambda s: s.str.replace('\r\n', NEWLINE, regex=False))
+            if replace_newlines:
+                df_s = df_s.apply(lambda s: s.str.replace(NEWLINE, replace_with, regex=False))
+            df_s = df_s.apply(lambda s: s.str.strip())
+
+        return header, df_s
+
+    def _frame_rows(self, df_s):
+        """Get the rows of a stringified dataframe and the widths of its cells.
+
+        Only the columns containing newlines are split into lines cell by
+        cell, the others are measured by a vectorized string length.
+
+        Args:
+            df_s(pandas.core.frame.DataFrame):
+                dataframe of strings
+        Return:
+            tuple(list, pandas.core.frame.DataFrame): rows and the widths of their cells
+        """
+        values = df_s.to_numpy()
+        lengths = []
+        multiline = None
+
+        for i in range(df_s.shape[1]):
+            s = df_s.iloc[:, i]
+            if len(s.index) and s.str.contains(NEWLINE, regex=False).any():
+                s = s.map(split_cell)
+                values[:, i] = s.to_numpy()
+                lengths.append(s.map(cell_width).to_numpy())
+                is_multiline = s.map(lambda c: type(c) is tuple).to_numpy()
+                multiline = is_multiline if multiline is None else multiline | is_multiline
+            else:
+                lengths.append(s.str.len().to_numpy())
+
+        rows = values.tolist()
+        if multiline is not None:
+            rows = [MultiLineRow(r) if m else r for r, m in zip(rows, multiline)]
 
-        # replace function
-        rep = lambda x : x if not replace_newlines else x.replace('\r\n',NEWLINE).replace(NEWLINE,replace_with)
+        lengths = pd.DataFrame(np.column_stack(lengths) if lengths else None, index=df_s.index)
+        return rows, lengths
 
-        # add header
-        header = [rep(c).strip() for c in list(df_s.columns)]
-        self.add_header(header, table_name)
+    def df_to_grouped_tables(self, df, by, heading_level=2, section_name=None,
+                             sort=True, replace_newlines=False, replace_with='; '):
+        """Generate a heading and a table for every group of a pandas dataframe.
 
-        # iterate over rows and add them
-        for i in df.index:
-            row = [rep(c).strip() for c in list(df_s.loc[i,:])]
-            self.add_row(row, table_name)
+        Equivalent to looping over ``df.groupby(by)`` and adding a heading, a
+        table and both to a section for every group, but the dataframe is
+        converted to strings and measured only once, and the column widths of
+        all groups come from a single groupby.
+
+        Both the heading block and the table of a group are named by the group
+        key, as yielded by ``df.groupby(by)``: a scalar if ``by`` is a single
+        column, a tuple if it is a list of columns (even of a single one).
+        Only observed groups are generated, unused categories of categorical
+        columns are skipped.
+
+        Args:
+            df(pandas.core.frame.DataFrame):
+                dataframe
+            by(str or list):
+                column(s) to group by
+            heading_level(int):
+                level of the group headings, 1, 2 or 3
+            section_name(str):
+                section to add the headings and tables to
+                (if None) uses the default section
+            sort(boolean):
+                True if the groups should be sorted by their keys
+            replace_newlines(boolean):
+                True if newline char should be replaced
+            replace_with(str):
+                what to replace newline char with
+        """
+        if heading_level not in (1, 2, 3):
+            raise ValueError('Heading level must be 1, 2 or 3')
+
+        header, df_s = self._stringify_frame(df, replace_newlines, replace_with)
+        all_rows, lengths = self._frame_rows(df_s)
+
+        # group on the original values, measure the stringified ones
+        by_cols = list(by) if isinstance(by, (list, tuple)) else [by]
+        keys = df[by_cols[0]] if len(by_cols) == 1 else [df[c] for c in by_cols]
+        grouped = lengths.groupby(keys, sort=sort, observed=True)
+        groups_widths = grouped.max()
+        groups_indices = grouped.indices
+
+        # a list of a single column gives 1-tuple keys, as df.groupby does
+        names = list(groups_widths.index)
+        if isinstance(by, (list, tuple)) and len(by_cols) == 1:
+            names = [(k,) for k in names]
+
+        existing = [k for k in names if k in self._tables]
+        if existing:
+            raise ValueError('Table under {} already existing'.format(existing[0]))
+
+        header_widths = cells_widths(header)
+        heading_kind = 'h{}'.format(heading_level)
+
+        for key, name, widths in zip(groups_widths.index, names, groups_widths.to_numpy().tolist()):
+            title = ', '.join([str(k) for k in name]) if isinstance(name, tuple) else str(name)
+            self._add_to_block(name, Element(heading_kind, title))
+
+            rows = [all_rows[i] for i in groups_indices[key]]
+            cols_widths = [max(a, int(b)) for a, b in zip(header_widths, widths)]
+            self._data_to_table((header, rows, cols_widths), name)
+
+            self.add_block_to_section(block_name=name, section_name=section_name)
+            self.add_table_to_section(table_name=name, section_name=section_name)
+
+    def _data_to_table(self, data, table_name):
+        """Generate a full table from data prepared by an adapter.
+
+        Args:
+            data(tuple):
+                header (or None), rows and column widths,
+                as returned by the functions of markdgenerator.adapters
+            table_name(str):
+                table to generate
+                (if None) uses the default table
+        """
+        header, rows, cols_widths = data
+
+        with self._reserve(lambda: _rows_size(rows) + _NEW_TABLE_SIZE), self._lock("table", table_name):
+            if table_name in self._tables:
+                raise ValueError('Table under {} already existing'.format(table_name))
+
+            self._flush_table(table_name)
+            table = self._tables[table_name]
+            if header is not None:
+                table['header'] = header
+                table['has_header'] = True
+                table['extra_lines'] = extra_lines(header)
+            table['rows'] = rows
+            table['rows_count'] = len(rows)
+            table['extra_lines'] += sum([r.height - 1 for r in rows if type(r) is not list])
+            table['cols_widths'] = cols_widths
+            table['cols_count'] = len(cols_widths)
+            self._touch("table", table_name)
 
         # declare it to be the element used last
         self._last_element = table_name
+
+    def from_records(self, records, columns=None, table_name=None):
+        """Generate a full table from records.
+
+        Args:
+            records(iterable):
+                records, each a sequence of cells or a mapping
+                from column names to cells
+            columns(list):
+                column names, used as the header and, for mappings, to select
+                and order the cells
+                (if None) mappings use the keys of the first record,
+                sequences generate a table without a header
+            table_name(str):
+                table to generate
+                (if None) uses the default table
+        """
+        self._data_to_table(adapters.from_records(records, columns), table_name)
+
+    def from_numpy(self, array, table_name=None):
+        """Generate a full table from a numpy structured array.
+
+        Args:
+            array(numpy.ndarray):
+                one-dimensional structured array,
+                field names are used as the header
+            table_name(str):
+                table to generate
+                (if None) uses the default table
+        """
+        self._data_to_table(adapters.from_numpy(array), table_name)
+
+    def from_arrow(self, data, table_name=None):
+        """Generate a full table from an Arrow table or record batch.
+
+        Requires pyarrow. Cells are formatted by Arrow's string casts.
+
+        Args:
+            data(pyarrow.Table or pyarrow.RecordBatch):
+                Arrow data, column names are used as the header
+            table_name(str):
+                table to generate
+                (if None) uses the default table
+        """
+        self._data_to_table(adapters.from_arrow(data), table_name)
+
+    def from_cursor(self, cursor, table_name=None, batch_size=1000):
+        """Generate a full table from an executed DB-API cursor.
+
+        Args:
+            cursor:
+                DB-API 2.0 cursor with an executed query,
+                column names from its description are used as the header
+            table_name(str):
+                table to generate
+                (if None) uses the default table
+            batch_size(int):
+                number of rows fetched at once with fetchmany
+        """
+        self._data_to_table(adapters.from_cursor(cursor, batch_size), table_name)
+
+    def memory_usage(self, deep=True):
+        """Get the memory used by the contents of the generator.
+
+        Similar to pandas.DataFrame.memory_usage, strings shared by multiple
+        cells are counted for each of them.
+
+        Args:
+            deep(boolean):
+                True if the strings should be counted,
+                otherwise only the containers are
+
+        Return:
+            dict: bytes per block, per table (header, rows, widths and
+            the estimated size of its rendered output), per section and in total
+        """
+        usage = {'blocks': {}, 'tables': {}, 'sections': {}}
+
+        for name, block in list(self._blocks.items()):
+            usage['blocks'][name] = sys.getsizeof(block) + sum([_element_size(el, deep) for el in list(block)])
+
+        for name, table in list(self._tables.items()):
+            with self._lock("table", name):
+                table_usage = _table_size(table, deep)
+                table_usage['rendered'] = self._estimate_table_size(
+                    table['cols_widths'], table['rows_count'], table['has_header'], table['extra_lines'])
+            usage['tables'][name] = table_usage
+
+        for name, section in list(self._sections.items()):
+            usage['sections'][name] = sys.getsizeof(section) + sum([sys.getsizeof(el) for el in list(section)])
+
+        usage['total'] = sum(usage['blocks'].values()) + sum(usage['sections'].values()) + \
+            sum([t['header'] + t['rows'] + t['widths'] for t in usage['tables'].values()])
+        usage['rendered'] = sum([t['rendered'] for t in usage['tables'].values()])
+
+        return usage
+
+    @abstractmethod
+    def _estimate_table_size(self, cols_widths, rows_count, has_header, extra_lines=0):
+        """Estimate the rendered size of a table without rendering it.
+
+        Multi-line rows and headers are accounted by their number of lines.
+
+        Args:
+            cols_widths(list):
+                widths of the columns
+            rows_count(int):
+                number of rows
+            has_header(boolean):
+                True if the table has a header
+            extra_lines(int):
+                lines of the multi-line rows and header beyond their first one
+        Return:
+            int: number of characters (bytes for ASCII contents)
+        """
+        pass
+
+    def set_memory_budget(self, limit, on_exceed=None):
+        """Limit the memory used by the contents of the generator.
+
+        Additions are checked against the limit before they are stored.
+        If an addition would cross it, ``on_exceed(generator, nbytes)`` is
+        called first, e.g. to spill the document to disk and clear it, then
+        the usage is measured again. A MemoryError is raised if the addition
+        still does not fit.
+
+        Args:
+            limit(int):
+                budget in bytes, as counted by memory_usage(deep=True)
+                (if None) removes the budget
+            on_exceed(callable):
+                spill function called with the generator and the number
+                of bytes to add
+                (if None) exceeding the budget raises a MemoryError
+        """
+        # measured before the budget lock is taken, memory_usage takes the table locks
+        used = self.memory_usage()['total'] if limit is not None else 0
+        with self._lock("budget", None):
+            self._memory_budget['limit'] = limit
+            self._memory_budget['on_exceed'] = on_exceed
+            self._memory_budget['used'] = used
+
+    def _reserve(self, size_func):
+        """Account an addition to the memory budget, before it is stored.
+
+        Args:
+            size_func(callable):
+                function returning the bytes of the addition,
+                called only if a budget is set
+        Return:
+            context manager giving the bytes back if the addition fails
+        """
+        budget = self._memory_budget
+        if budget['limit'] is None:
+            return _NO_LOCK
+
+        nbytes = size_func()
+        with self._lock("budget", None):
+            fits = budget['used'] + nbytes <= budget['limit']
+            if fits:
+                budget['used'] += nbytes
+                return _Reservation(self, nbytes)
+
+        # the spill function renders and clears contents, taking their locks,
+        # so it is called without holding the budget lock
+        if budget['on_exceed'] is not None:
+            budget['on_exceed'](self, nbytes)
+            used = self.memory_usage()['total']
+            with self._lock("budget", None):
+                budget['used'] = used
+
+        with self._lock("budget", None):
+            if budget['used'] + nbytes > budget['limit']:
+                raise MemoryError('Memory budget of {} bytes exceeded'.format(budget['limit']))
+            budget['used'] += nbytes
+        return _Reservation(self, nbytes)
+
+    def _release(self, nbytes):
+        """Account removed contents to the memory budget.
+
+        Args:
+            nbytes(int):
+                bytes removed
+        """
+        with self._lock("budget", None):
+            self._memory_budget['used'] = max(0, self._memory_budget['used'] - nbytes)
+
+    def clear(self):
+        """Remove all blocks, tables and sections.
+
+        The sections rendered by write_document and cached by this
+        generator are dropped too. The cache is not part of the memory
+        budget, clearing the generator is what bounds it.
+        """
+        # elements are removed under their locks, producers may still add to them
+        for element_type, elements in (("block", self._blocks), ("table", self._tables)):
+            for name in list(elements):
+                with self._lock(element_type, name):
+                    self._touch(element_type, name)
+                    elements.pop(name, None)
+        for name in list(self._sections):
+            with self._lock("section", name):
+                self._sections.pop(name, None)
+        self._rendered_sections = {}
+        self._last_element = None
+
+        with self._lock("budget", None):
+            self._memory_budget['used'] = 0
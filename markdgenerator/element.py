@@ -0,0 +1,36 @@
+"""Document elements."""
+
+
+class Element:
+    """Lightweight node of a text block.
+
+    Elements keep the unformatted contents of a block so that the same
+    document can be rendered by any backend at render time.
+
+    Args:
+        kind(str):
+            element type, one of 'h1', 'h2', 'h3', 'paragraph', 'codeblock'
+        text(str):
+            unformatted contents of the element
+        attributes(dict):
+            backend-independent options of the element
+            (if None) no options
+    """
+
+    __slots__ = ('kind', 'text', 'attributes')
+
+    def __init__(self, kind, text, attributes=None):
+        """Init function."""
+        self.kind = kind
+        self.text = text
+        self.attributes = attributes if attributes is not None else {}
+
+    def __repr__(self):
+        """Get debugging representation."""
+        return 'Element({!r}, {!r}, {!r})'.format(self.kind, self.text, self.attributes)
+
+    def __eq__(self, other):
+        """Compare two elements by contents."""
+        if not isinstance(other, Element):
+            return NotImplemented
+        return (self.kind, self.text, self.attributes) == (other.kind, other.text, other.attributes)
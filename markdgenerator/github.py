@@ -0,0 +1,116 @@
+"""GitHub Flavored Markdown module."""
+from itertools import chain
+from markdgenerator.cells import join_lines, cells_widths
+from markdgenerator.pandoc import PandocMdGenerator
+from markdgenerator.config import NEWLINE
+
+class GithubMdGenerator(PandocMdGenerator):
+    """Class to generate GitHub Flavored Markdown text with.
+
+    Headings and paragraphs are shared with Pandoc Markdown, code blocks
+    are fenced with backticks and tables are rendered as pipe tables.
+    Pipe table cells have a single line, the lines of multi-line cells
+    are joined with <br> tags. Pipes within cells are escaped.
+    """
+
+    def _codeblock(self, text, language=None):
+        """Generate markdown codeparagraph.
+
+        Args:
+            text(str):
+                string to write
+            language(str):
+                language of the code
+                (if None) no language is declared
+        Returns:
+            str
+        """
+        fence = '```' if language is None else '```{}'.format(language)
+        return NEWLINE.join((fence, text, '```')) + NEWLINE
+
+    def _iter_table_lines(self, header, rows, cols_widths):
+        """Generate the lines of a pipe table one by one.
+
+        Args:
+            header(list):
+                header cells
+                (if None) the table has no header
+            rows(iterable):
+                rows, each a list of strings, or a MultiLineRow
+            cols_widths(list):
+                widths of the columns
+        Yields:
+            str
+        """
+        # pipe tables always need a header line, use empty cells if missing
+        if header is None:
+            header = ['']*len(cols_widths)
+        elif type(header) is not list:
+            header = [join_lines(c, '<br>') for c in header]
+        yield '| '+' | '.join([c.replace('|', '\\|').ljust(w) for (c,w) in zip(header,cols_widths)])+' |'
+        yield '|'+'|'.join(['-'*(w+2) for w in cols_widths])+'|'
+
+        # add rows, multi-line cells are joined into a single line
+        for r in rows:
+            if type(r) is not list:
+                r = [join_lines(c, '<br>') for c in r]
+            yield '| '+' | '.join([c.replace('|', '\\|').ljust(w) for (c,w) in zip(r,cols_widths)])+' |'
+
+    def _cells_widths(self, cells):
+        """Get the widths of the cells of a row or a header as rendered.
+
+        Args:
+            cells(list):
+                row or header
+        Return:
+            list
+        """
+        if type(cells) is list and not any(['|' in c for c in cells]):
+            return cells_widths(cells)
+        return [len(join_lines(c, '<br>').replace('|', '\\|')) for c in cells]
+
+    def _rendered_widths(self, header, rows, cols_widths):
+        """Get the widths of the columns of a table as rendered.
+
+        Columns are widened for the escaped pipes and the joined lines
+        of multi-line cells.
+
+        Args:
+            header(list):
+                header cells
+                (if None) the table has no header
+            rows(list):
+                rows, each a list of strings, or a MultiLineRow
+            cols_widths(list):
+                widths of the cells of the columns
+        Return:
+            list
+        """
+        for cells in chain([header] if header is not None else [], rows):
+            if type(cells) is list and not any(['|' in c for c in cells]):
+                continue
+            cols_widths = [max(a, b) for a, b in zip(cols_widths, self._cells_widths(cells))]
+        return cols_widths
+
+    def _estimate_table_size(self, cols_widths, rows_count, has_header, extra_lines=0):
+        """Estimate the rendered size of a pipe table without rendering it.
+
+        Rows have a single line, the lines of multi-line cells are joined
+        and not accounted.
+
+        Args:
+            cols_widths(list):
+                widths of the columns
+            rows_count(int):
+                number of rows
+            has_header(boolean):
+                True if the table has a header
+            extra_lines(int):
+                lines of the multi-line rows and header beyond their first one
+        Return:
+            int: number of characters (bytes for ASCII contents)
+        """
+        # every line is followed by a newline, cells are padded by a space on both sides
+        line_length = sum(cols_widths) + 3*len(cols_widths) + 1
+        lines_count = 2 + rows_count
+        return lines_count*(line_length + 1)
@@ -1,4 +1,5 @@
 """Pandoc Markdown module."""
+from markdgenerator.cells import iter_lines
 from markdgenerator.common import CommonMdGenerator
 from markdgenerator.config import NEWLINE
 
@@ -49,28 +50,32 @@ class PandocMdGenerator(CommonMdGenerator):
         """
         return NEWLINE + str(text) + NEWLINE
 
-    def _codeblock(self, text):
+    def _codeblock(self, text, language=None):
         """Generate markdown codeparagraph.
 
         Args:
             text(str):
                 string to write
+            language(str):
+                language of the code
+                (if None) no language is declared
         Returns:
             str
         """
-        return NEWLINE.join(('~~~~~~', text, '~~~~~~')) + NEWLINE
+        fence = '~~~~~~' if language is None else '~~~~~~ {{.{}}}'.format(language)
+        return NEWLINE.join((fence, text, '~~~~~~')) + NEWLINE
 
     def _render_block(self, block):
         """Finalize text block output.
 
         Args:
             block(list):
-                list of strings corresponding to block elements
+                list of Element objects of the block
 
         Return:
             str
         """
-        return NEWLINE.join(block)+NEWLINE
+        return NEWLINE.join([self._render_element(el) for el in block])+NEWLINE
 
     def _render_section(self, section):
         """Finalize section output.
@@ -98,20 +103,62 @@ class PandocMdGenerator(CommonMdGenerator):
         Return:
             str
         """
-        cols_widths = table['cols_widths']
-        table_list = []
+        header = table['header'] if table['has_header'] else None
+        cols_widths = self._rendered_widths(header, table['rows'], table['cols_widths'])
+        return NEWLINE.join(self._iter_table_lines(header, table['rows'], cols_widths))+NEWLINE
+
+    def _iter_table_lines(self, header, rows, cols_widths):
+        """Generate the lines of a grid table one by one.
+
+        Args:
+            header(list):
+                header cells
+                (if None) the table has no header
+            rows(iterable):
+                rows, each a list of strings, or a MultiLineRow
+            cols_widths(list):
+                widths of the columns
+        Yields:
+            str
+        """
+        separator = '+'+'+'.join(['-'*w for w in cols_widths])+'+'
 
         # add first grid line
-        table_list.append('+'+'+'.join(['-'*w for w in cols_widths])+'+')
+        yield separator
 
         # add header
-        if table['has_header']:
-            table_list.append('|'+'|'.join([format(c, '{}'.format(w)) for (c,w) in zip(table['header'],cols_widths)])+'|')
-            table_list.append('+'+'+'.join(['='*w for w in cols_widths])+'+')
+        if header is not None:
+            for line in iter_lines(header):
+                yield '|'+'|'.join([c.ljust(w) for (c,w) in zip(line,cols_widths)])+'|'
+            yield '+'+'+'.join(['='*w for w in cols_widths])+'+'
 
-        # add rows
-        for r in table['rows']:
-            table_list.append('|'+'|'.join([format(c, '{}'.format(w)) for (c,w) in zip(r,cols_widths)])+'|')
-            table_list.append('+'+'+'.join(['-'*w for w in cols_widths])+'+')
+        # add rows, single-line rows directly
+        for r in rows:
+            if type(r) is list:
+                yield '|'+'|'.join([c.ljust(w) for (c,w) in zip(r,cols_widths)])+'|'
+            else:
+                for line in iter_lines(r):
+                    yield '|'+'|'.join([c.ljust(w) for (c,w) in zip(line,cols_widths)])+'|'
+            yield separator
 
-        return NEWLINE.join(table_list)+NEWLINE
+    def _estimate_table_size(self, cols_widths, rows_count, has_header, extra_lines=0):
+        """Estimate the rendered size of a grid table without rendering it.
+
+        Multi-line rows and headers are accounted by their number of lines.
+
+        Args:
+            cols_widths(list):
+                widths of the columns
+            rows_count(int):
+                number of rows
+            has_header(boolean):
+                True if the table has a header
+            extra_lines(int):
+                lines of the multi-line rows and header beyond their first one
+        Return:
+            int: number of characters (bytes for ASCII contents)
+        """
+        # every line is followed by a newline, cells are separated by a single char
+        line_length = sum(cols_widths) + len(cols_widths) + 1
+        lines_count = 1 + (2 if has_header else 0) + 2*rows_count + extra_lines
+        return lines_count*(line_length + 1)
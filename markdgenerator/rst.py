@@ -0,0 +1,176 @@
+"""reStructuredText module."""
+from markdgenerator.cells import iter_lines
+from markdgenerator.common import CommonMdGenerator
+from markdgenerator.config import NEWLINE
+
+class RstGenerator(CommonMdGenerator):
+    """Class to generate reStructuredText with."""
+
+    def _heading(self, text, char):
+        """Generate underlined title.
+
+        Args:
+            text(str):
+                string to write
+            char(str):
+                character to underline the title with
+        Returns:
+            str
+        """
+        text = str(text)
+        return NEWLINE + text + NEWLINE + char*len(text)
+
+    def _h1(self, text):
+        """Generate rst h1 title.
+
+        Args:
+            text(str):
+                string to write
+        Returns:
+            str
+        """
+        return self._heading(text, '=')
+
+    def _h2(self, text):
+        """Generate rst h2 title.
+
+        Args:
+            text(str):
+                string to write
+        Returns:
+            str
+        """
+        return self._heading(text, '-')
+
+    def _h3(self, text):
+        """Generate rst h3 title.
+
+        Args:
+            text(str):
+                string to write
+        Returns:
+            str
+        """
+        return self._heading(text, '~')
+
+    def _paragraph(self, text):
+        """Generate rst paragraph text.
+
+        Args:
+            text(str):
+                string to write
+        Returns:
+            str
+        """
+        return NEWLINE + str(text) + NEWLINE
+
+    def _codeblock(self, text, language=None):
+        """Generate rst literal block.
+
+        Args:
+            text(str):
+                string to write
+            language(str):
+                language of the code
+                (if None) a plain literal block is generated
+        Returns:
+            str
+        """
+        directive = '::' if language is None else '.. code-block:: {}'.format(language)
+        body = NEWLINE.join(['    ' + l if l else l for l in text.split(NEWLINE)])
+        return NEWLINE + directive + NEWLINE + NEWLINE + body + NEWLINE
+
+    def _render_block(self, block):
+        """Finalize text block output.
+
+        Args:
+            block(list):
+                list of Element objects of the block
+
+        Return:
+            str
+        """
+        return NEWLINE.join([self._render_element(el) for el in block])+NEWLINE
+
+    def _render_section(self, section):
+        """Finalize section output.
+
+        Args:
+            section(list):
+                list of section components
+
+        Return:
+            str
+        """
+        rendfunc = lambda x: self.render_table(x['name']) if x['type'] == "table" else self.render_block(x['name'])
+        return NEWLINE.join([rendfunc(el) for el in section])
+
+    def _render_table(self, table):
+        """Finalize table output.
+
+        Args:
+            table(dict):
+                table with all its elements
+        Return:
+            str
+        """
+        header = table['header'] if table['has_header'] else None
+        cols_widths = self._rendered_widths(header, table['rows'], table['cols_widths'])
+        return NEWLINE.join(self._iter_table_lines(header, table['rows'], cols_widths))+NEWLINE
+
+    def _iter_table_lines(self, header, rows, cols_widths):
+        """Generate the lines of a grid table one by one.
+
+        Args:
+            header(list):
+                header cells
+                (if None) the table has no header
+            rows(iterable):
+                rows, each a list of strings, or a MultiLineRow
+            cols_widths(list):
+                widths of the columns
+        Yields:
+            str
+        """
+        # cells are padded by a space on both sides
+        separator = '+'+'+'.join(['-'*(w+2) for w in cols_widths])+'+'
+
+        # add first grid line
+        yield separator
+
+        # add header
+        if header is not None:
+            for line in iter_lines(header):
+                yield '| '+' | '.join([c.ljust(w) for (c,w) in zip(line,cols_widths)])+' |'
+            yield '+'+'+'.join(['='*(w+2) for w in cols_widths])+'+'
+
+        # add rows, single-line rows directly
+        for r in rows:
+            if type(r) is list:
+                yield '| '+' | '.join([c.ljust(w) for (c,w) in zip(r,cols_widths)])+' |'
+            else:
+                for line in iter_lines(r):
+                    yield '| '+' | '.join([c.ljust(w) for (c,w) in zip(line,cols_widths)])+' |'
+            yield separator
+
+    def _estimate_table_size(self, cols_widths, rows_count, has_header, extra_lines=0):
+        """Estimate the rendered size of a grid table without rendering it.
+
+        Multi-line rows and headers are accounted by their number of lines.
+
+        Args:
+            cols_widths(list):
+                widths of the columns
+            rows_count(int):
+                number of rows
+            has_header(boolean):
+                True if the table has a header
+            extra_lines(int):
+                lines of the multi-line rows and header beyond their first one
+        Return:
+            int: number of characters (bytes for ASCII contents)
+        """
+        # every line is followed by a newline, cells are padded by a space on both sides
+        line_length = sum(cols_widths) + 3*len(cols_widths) + 1
+        lines_count = 1 + (2 if has_header else 0) + 2*rows_count + extra_lines
+        return lines_count*(line_length + 1)
@@ -0,0 +1,173 @@
+"""Compressed output sinks.
+
+Sinks are text streams compressing their input incrementally, so that a
+document rendered into them with ``render_to`` is never held in memory as a
+whole, neither as a string nor as compressed bytes.
+"""
+from abc import ABC, abstractmethod
+import bz2
+import lzma
+import os
+import zlib
+
+
+class CompressedSink(ABC):
+    """Common (abstract) parent class of the compressed output sinks.
+
+    Args:
+        target(str or file):
+            path of the file to write to, or a binary file object
+        level(int):
+            compression level
+            (if None) uses the default level of the format
+        chunk_size(int):
+            number of encoded bytes buffered before they are compressed
+        encoding(str):
+            encoding of the text
+    """
+
+    # default compression level
+    default_level = None
+
+    def __init__(self, target, level=None, chunk_size=1 << 20, encoding='utf-8'):
+        """Init function."""
+        # an invalid level fails before the target file is opened
+        self._compressor = self._compressor_for(self.default_level if level is None else level)
+
+        if isinstance(target, (str, bytes, os.PathLike)):
+            self._file = open(target, 'wb')
+            self._owns_file = True
+        else:
+            self._file = target
+            self._owns_file = False
+
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self._buffer = bytearray()
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.closed = False
+
+    @abstractmethod
+    def _compressor_for(self, level):
+        """Create the compressor object.
+
+        Args:
+            level(int):
+                compression level
+        Return:
+            object with compress and flush methods
+        """
+        pass
+
+    def _write_compressed(self, data):
+        """Write compressed bytes to the target.
+
+        Args:
+            data(bytes):
+                compressed bytes
+        """
+        if data:
+            self._file.write(data)
+            self.compressed_bytes += len(data)
+
+    def _compress_buffer(self):
+        """Compress and write the buffered bytes."""
+        if self._buffer:
+            self.raw_bytes += len(self._buffer)
+            self._write_compressed(self._compressor.compress(bytes(self._buffer)))
+            self._buffer = bytearray()
+
+    def write(self, text):
+        """Write text to the sink.
+
+        Args:
+            text(str):
+                text to write
+        Return:
+            int: number of characters written
+        """
+        if self.closed:
+            raise ValueError('Sink already closed')
+
+        self._buffer += text.encode(self.encoding)
+        if len(self._buffer) >= self.chunk_size:
+            self._compress_buffer()
+        return len(text)
+
+    def close(self):
+        """Compress the remaining text and finalize the compressed stream."""
+        if self.closed:
+            return
+
+        self._compress_buffer()
+        self._write_compressed(self._compressor.flush())
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    @property
+    def ratio(self):
+        """Compression ratio, raw bytes per compressed byte."""
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+
+
+class GzipSink(CompressedSink):
+    """Sink writing a gzip compressed stream (.gz)."""
+
+    default_level = 9
+
+    def _compressor_for(self, level):
+        """Create the compressor object.
+
+        Args:
+            level(int):
+                compression level, 0 to 9
+        Return:
+            object with compress and flush methods
+        """
+        # wbits of 16 + MAX_WBITS produces a gzip header and trailer
+        return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+class Bz2Sink(CompressedSink):
+    """Sink writing a bzip2 compressed stream (.bz2)."""
+
+    default_level = 9
+
+    def _compressor_for(self, level):
+        """Create the compressor object.
+
+        Args:
+            level(int):
+                compression level, 1 to 9
+        Return:
+            object with compress and flush methods
+        """
+        return bz2.BZ2Compressor(level)
+
+
+class LzmaSink(CompressedSink):
+    """Sink writing an xz compressed stream (.xz)."""
+
+    default_level = 6
+
+    def _compressor_for(self, level):
+        """Create the compressor object.
+
+        Args:
+            level(int):
+                compression preset, 0 to 9
+        Return:
+            object with compress and flush methods
+        """
+        return lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=level)
@@ -0,0 +1,377 @@
+"""Frozen document snapshots.
+
+A snapshot is an immutable, pre-rendered document: UTF-8 bytes of the whole
+document followed by the blocks and tables not included in it, plus an
+index of byte ranges by block, table and section name. Published to
+shared memory or to a file, it can be attached by other processes without
+copying or rendering it again.
+"""
+import datetime
+import json
+import mmap
+import struct
+import numpy as np
+import pandas as pd
+from markdgenerator.config import NEWLINE
+
+# layout: magic, index length, payload length, JSON index, payload
+_MAGIC = b'MDGSNAP1'
+_HEADER = struct.Struct('<8sQQ')
+
+
+# types of the names stored in the JSON index as they are, tuples of names
+# are stored as lists and other names as objects tagged with their type
+_JSON_TYPES = (str, int, float, bool, type(None))
+
+
+def _name_to_json(name):
+    """Encode a name for the JSON index, so that it is restored as it is.
+
+    Args:
+        name:
+            name of a section, block or table
+    Return:
+        JSON serializable name
+    """
+    if type(name) in _JSON_TYPES:
+        return name
+    if isinstance(name, tuple):
+        return [_name_to_json(n) for n in name]
+    # e.g. keys of a groupby on datetime columns
+    if isinstance(name, pd.Timestamp):
+        return {'t': 'timestamp', 'v': name.isoformat(), 'tz': None if name.tz is None else str(name.tz)}
+    if isinstance(name, datetime.datetime):
+        return {'t': 'datetime', 'v': name.isoformat()}
+    if isinstance(name, datetime.date):
+        return {'t': 'date', 'v': name.isoformat()}
+    if isinstance(name, (np.datetime64, np.timedelta64)):
+        return {'t': 'numpy', 'dtype': name.dtype.str, 'v': int(name.view('int64'))}
+    if isinstance(name, (np.bool_, np.number, np.str_)) and not isinstance(name, np.complexfloating):
+        return {'t': 'numpy', 'dtype': name.dtype.str, 'v': name.item()}
+    raise TypeError('Name {!r} cannot be stored in a snapshot, use strings, numbers, '
+                    'dates, None or tuples of them'.format(name))
+
+
+def _name_from_json(name):
+    """Restore a name encoded by _name_to_json.
+
+    Args:
+        name:
+            name read from the JSON index
+    Return:
+        name of a section, block or table
+    """
+    if isinstance(name, list):
+        return tuple([_name_from_json(n) for n in name])
+    if not isinstance(name, dict):
+        return name
+    if name['t'] == 'timestamp':
+        timestamp = pd.Timestamp(name['v'])
+        return timestamp if name['tz'] is None else timestamp.tz_convert(name['tz'])
+    if name['t'] == 'datetime':
+        return datetime.datetime.fromisoformat(name['v'])
+    if name['t'] == 'date':
+        return datetime.date.fromisoformat(name['v'])
+    dtype = np.dtype(name['dtype'])
+    if dtype.kind in 'mM':
+        return np.int64(name['v']).view(dtype)
+    return dtype.type(name['v'])
+
+
+class DocumentSnapshot:
+    """Immutable pre-rendered document.
+
+    Snapshots are created by the ``freeze`` method of the generators, or
+    attached with ``from_shared_memory`` and ``open``.
+
+    Args:
+        buffer(memoryview):
+            read-only payload bytes
+        index(dict):
+            byte ranges (offset, length) of the payload, keyed by
+            ("document" | "section" | "block" | "table", name)
+        owner:
+            shared memory or memory map holding the buffer, if any
+    """
+
+    def __init__(self, buffer, index, owner=None):
+        """Init function."""
+        self._buffer = buffer
+        self._index = index
+        self._owner = owner
+
+    @classmethod
+    def from_generator(cls, generator):
+        """Render all contents of a generator into a snapshot.
+
+        Args:
+            generator(CommonMdGenerator):
+                generator to freeze
+        Return:
+            DocumentSnapshot
+        """
+        payload = bytearray()
+        index = {}
+        newline = NEWLINE.encode('utf-8')
+
+        def add_part(key, text):
+            data = text.encode('utf-8')
+            index.setdefault(key, (len(payload), len(data)))
+            payload.extend(data)
+
+        # the document is laid out exactly as str(generator) renders it,
+        # components are indexed at their first occurrence
+        sections = list(generator._sections)
+        blocks = list(generator._blocks)
+        tables = list(generator._tables)
+        # names are checked to be storable in the index before rendering
+        for name in sections + blocks + tables:
+            _name_to_json(name)
+        if sections:
+            for i, section_name in enumerate(sections):
+                if i:
+                    payload.extend(newline)
+                start = len(payload)
+                with generator._lock("section", section_name):
+                    section = list(generator._sections[section_name])
+                for j, el in enumerate(section):
+                    if j:
+                        payload.extend(newline)
+                    if el['type'] == "table":
+                        add_part(("table", el['name']), generator.render_table(el['name']))
+                    else:
+                        add_part(("block", el['name']), generator.render_block(el['name']))
+                index[("section", section_name)] = (start, len(payload) - start)
+        elif blocks:
+            for i, block_name in enumerate(blocks):
+                if i:
+                    payload.extend(newline)
+                add_part(("block", block_name), generator.render_block(block_name))
+        else:
+            for i, table_name in enumerate(tables):
+                if i:
+                    payload.extend(newline)
+                add_part(("table", table_name), generator.render_table(table_name))
+        index[("document", None)] = (0, len(payload))
+
+        # blocks and tables not included in the document
+        for block_name in blocks:
+            if ("block", block_name) not in index:
+                add_part(("block", block_name), generator.render_block(block_name))
+        for table_name in tables:
+            if ("table", table_name) not in index:
+                add_part(("table", table_name), generator.render_table(table_name))
+
+        return cls(memoryview(bytes(payload)), index)
+
+    @classmethod
+    def from_buffer(cls, buffer, owner=None):
+        """Attach a snapshot serialized by to_bytes, without copying its payload.
+
+        Args:
+            buffer(buffer):
+                serialized snapshot, e.g. shared memory or a memory map
+            owner:
+                object to keep alive and close with the snapshot
+        Return:
+            DocumentSnapshot
+        """
+        view = memoryview(buffer).cast('B')
+        magic, index_length, payload_length = _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            raise ValueError('Not a document snapshot')
+
+        start = _HEADER.size + index_length
+        entries = json.loads(bytes(view[_HEADER.size:start]).decode('utf-8'))
+        index = {(kind, _name_from_json(name)): (offset, length) for kind, name, offset, length in entries}
+        payload = view[start:start + payload_length]
+        if not payload.readonly and hasattr(payload, 'toreadonly'):
+            payload = payload.toreadonly()
+        view.release()
+        return cls(payload, index, owner)
+
+    def to_bytes(self):
+        """Serialize the snapshot, index included.
+
+        Return:
+            bytes
+        """
+        header, index = self._serialized_index()
+        return header + index + self._buffer.tobytes()
+
+    def _serialized_index(self):
+        """Get the serialized header and index.
+
+        Return:
+            tuple(bytes, bytes)
+        """
+        entries = [[kind, _name_to_json(name), offset, length] for (kind, name), (offset, length) in self._index.items()]
+        index = json.dumps(entries).encode('utf-8')
+        return _HEADER.pack(_MAGIC, len(index), len(self._buffer)), index
+
+    def _write_into(self, buffer):
+        """Serialize the snapshot into a writable buffer.
+
+        Args:
+            buffer(buffer):
+                buffer of at least nbytes bytes
+        """
+        header, index = self._serialized_index()
+        buffer[:len(header)] = header
+        buffer[len(header):len(header) + len(index)] = index
+        start = len(header) + len(index)
+        buffer[start:start + len(self._buffer)] = self._buffer
+
+    @property
+    def nbytes(self):
+        """Size of the serialized snapshot in bytes."""
+        header, index = self._serialized_index()
+        return len(header) + len(index) + len(self._buffer)
+
+    def to_shared_memory(self, name=None):
+        """Publish the snapshot in a new shared memory block.
+
+        The caller owns the block: keep a reference to it while other
+        processes attach it, and close and unlink it when done.
+        Requires Python 3.8 or newer.
+
+        Args:
+            name(str):
+                name of the shared memory block
+                (if None) a unique name is generated
+        Return:
+            multiprocessing.shared_memory.SharedMemory
+        """
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=self.nbytes)
+        self._write_into(shm.buf)
+        return shm
+
+    @classmethod
+    def from_shared_memory(cls, name):
+        """Attach a snapshot published with to_shared_memory.
+
+        Args:
+            name(str):
+                name of the shared memory block
+        Return:
+            DocumentSnapshot
+        """
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(name=name)
+        return cls.from_buffer(shm.buf, owner=shm)
+
+    def to_file(self, path):
+        """Write the snapshot to a file, to be memory-mapped with open.
+
+        Args:
+            path(str):
+                file to write to
+        """
+        header, index = self._serialized_index()
+        with open(path, 'wb') as fp:
+            fp.write(header)
+            fp.write(index)
+            fp.write(self._buffer)
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a snapshot written with to_file.
+
+        Args:
+            path(str):
+                snapshot file
+        Return:
+            DocumentSnapshot
+        """
+        with open(path, 'rb') as fp:
+            mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_buffer(mm, owner=mm)
+
+    def close(self):
+        """Release the buffer and detach the shared memory or memory map.
+
+        Views returned by ``view`` must be released first.
+        """
+        self._buffer.release()
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def names(self, element_type):
+        """Get the names of the indexed elements of a type.
+
+        Args:
+            element_type(str):
+                "section", "block" or "table"
+        Return:
+            list
+        """
+        return [name for (kind, name) in self._index if kind == element_type]
+
+    def view(self, element_type, name=None):
+        """Get the rendered bytes of an element without copying them.
+
+        Args:
+            element_type(str):
+                "document", "section", "block" or "table"
+            name(str):
+                name of the element
+                (if None) the default one
+        Return:
+            memoryview: read-only UTF-8 bytes
+        """
+        key = (element_type, name)
+        if key not in self._index:
+            raise KeyError('{} {} not in the snapshot'.format(element_type, name))
+        offset, length = self._index[key]
+        return self._buffer[offset:offset + length]
+
+    def render_section(self, section_name=None):
+        """Get the markdown string of a section.
+
+        Args:
+            section_name(str):
+                section to render
+                (if None) renders the default section
+        Return:
+            str
+        """
+        return str(self.view("section", section_name), 'utf-8')
+
+    def render_block(self, block_name=None):
+        """Get the markdown string of a block.
+
+        Args:
+            block_name(str):
+                block to render
+                (if None) renders the default block
+        Return:
+            str
+        """
+        return str(self.view("block", block_name), 'utf-8')
+
+    def render_table(self, table_name=None):
+        """Get the markdown string of a table.
+
+        Args:
+            table_name(str):
+                table to render
+                (if None) renders the default table
+        Return:
+            str
+        """
+        return str(self.view("table", table_name), 'utf-8')
+
+    def __str__(self):
+        """Get string representation."""
+        return str(self.view("document"), 'utf-8')
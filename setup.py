@@ -36,13 +36,20 @@ setup(
     python_requires='>=3.6',
     install_requires=[
         "pandas>=0.24.0",
+        "numpy",
     ],
     extras_require={
         "test": ["pytest"],
         "doc": ["sphinx"],
-        "all": ["pytest", "sphinx"]
+        "arrow": ["pyarrow"],
+        "all": ["pytest", "sphinx", "pyarrow"]
+    },
+    packages=find_packages(exclude=["tests", "docs", "backends", "benchmarks"]),
+    entry_points={
+        "console_scripts": [
+            "markdgenerator=markdgenerator.cli:main",
+        ],
     },
-    packages=find_packages(exclude=["tests", "docs", "backends"]),
     include_package_data=True,
     keywords="markdown, rst",
     classifiers=[
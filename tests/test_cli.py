@@ -0,0 +1,91 @@
+"""Command-line interface tests."""
+from markdgenerator.cli import main
+from markdgenerator.config import NEWLINE
+import pytest
+
+GRID_TABLE = (
+    '+----+---+' + NEWLINE +
+    '|name|age|' + NEWLINE +
+    '+====+===+' + NEWLINE +
+    '|john|30 |' + NEWLINE +
+    '+----+---+' + NEWLINE +
+    '|tom |4  |' + NEWLINE +
+    '+----+---+' + NEWLINE
+)
+
+
+@pytest.mark.parametrize("file_name, contents", [
+        ('actors.csv', 'name,age\njohn,30\ntom,4\n'),
+        ('actors.tsv', 'name\tage\njohn\t30\ntom\t4\n'),
+        ('actors.jsonl', '{"name": "john", "age": 30}\n\n{"name": "tom", "age": 4}\n'),
+])
+def test_cli_stdout(tmp_path, capsys, file_name, contents):
+    """Test conversion of the input formats to stdout."""
+    path = tmp_path / file_name
+    path.write_text(contents)
+    assert main([str(path), '--quiet']) == 0
+    assert GRID_TABLE == capsys.readouterr().out
+
+
+def test_cli_output_dir(tmp_path):
+    """Test parallel conversion of multiple files to an output directory."""
+    paths = []
+    for i in range(3):
+        path = tmp_path / 'data_{}.csv'.format(i)
+        path.write_text('a,b\n1,"x\ny"\n')
+        paths.append(str(path))
+
+    out = tmp_path / 'out'
+    assert main(paths + ['-o', str(out), '-j', '2', '-f', 'pipe', '--min-width', '2', '-q']) == 0
+    for i in range(3):
+        assert (out / 'data_{}.md'.format(i)).read_text() == (
+            '| a  | b   |' + NEWLINE +
+            '|----|-----|' + NEWLINE +
+            '| 1  | x y |' + NEWLINE)
+
+
+def test_cli_output_names(tmp_path):
+    """Test inputs with the same name are written to distinct outputs."""
+    (tmp_path / 'd.csv').write_text('a\n1\n')
+    (tmp_path / 'd.tsv').write_text('a\n2\n')
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'd.csv').write_text('a\n3\n')
+
+    out = tmp_path / 'out'
+    paths = [str(tmp_path / 'd.csv'), str(tmp_path / 'd.tsv')]
+    assert main(paths + ['-o', str(out), '-j', '2', '-q']) == 0
+    assert '1' in (out / 'd.csv.md').read_text()
+    assert '2' in (out / 'd.tsv.md').read_text()
+
+    # same file names in different directories cannot be told apart
+    assert main([paths[0], str(tmp_path / 'sub' / 'd.csv'), '-o', str(out), '-q']) == 1
+
+
+@pytest.mark.parametrize("file_name, contents", [
+        ('ragged.csv', 'a,b\n1\n'),
+        ('empty.csv', ''),
+        ('empty.jsonl', '\n'),
+        ('array.jsonl', '{"a": 1}\n[1, 2]\n'),
+        ('invalid.jsonl', '{"a": \n'),
+        ('data.xml', None),
+])
+def test_cli_errors(tmp_path, file_name, contents):
+    """Test invalid inputs are reported with an exit code."""
+    path = tmp_path / file_name
+    if contents is not None:
+        path.write_text(contents)
+    assert main([str(path), '-q']) == 1
+
+
+def test_cli_keep_newlines(tmp_path, capsys):
+    """Test newlines within cells kept as multi-line grid cells."""
+    path = tmp_path / 'notes.csv'
+    path.write_text('a,b\n1,"x\r\nyy"\n')
+    assert main([str(path), '--keep-newlines', '-q']) == 0
+    assert capsys.readouterr().out == (
+        '+-+--+' + NEWLINE +
+        '|a|b |' + NEWLINE +
+        '+=+==+' + NEWLINE +
+        '|1|x |' + NEWLINE +
+        '| |yy|' + NEWLINE +
+        '+-+--+' + NEWLINE)
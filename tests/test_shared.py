@@ -1,12 +1,14 @@
 """Unit tests."""
 from markdgenerator.common import CommonMdGenerator
-from markdgenerator import PandocMdGenerator
+from markdgenerator import PandocMdGenerator, GithubMdGenerator, RstGenerator
 from markdgenerator.config import NEWLINE
 import pandas as pd
 import pytest
 
 @pytest.mark.parametrize("MdGenerator", [
-        (PandocMdGenerator)
+        (PandocMdGenerator),
+        (GithubMdGenerator),
+        (RstGenerator)
 ])
 def test_init(MdGenerator):
     """Test object init."""
@@ -19,6 +21,12 @@ def test_init(MdGenerator):
         (PandocMdGenerator, 'h3', 'h3', NEWLINE+'### h3'+NEWLINE),
         (PandocMdGenerator, 'paragraph', 'dummy', NEWLINE+'dummy'+NEWLINE+NEWLINE),
         (PandocMdGenerator, 'codeparagraph', 'dummy', '~~~~~~'+NEWLINE+'dummy'+NEWLINE+'~~~~~~'+NEWLINE+NEWLINE),
+        (GithubMdGenerator, 'h1', 'dummy', NEWLINE+'# dummy'+NEWLINE),
+        (GithubMdGenerator, 'codeparagraph', 'dummy', '```'+NEWLINE+'dummy'+NEWLINE+'```'+NEWLINE+NEWLINE),
+        (RstGenerator, 'h1', 'dummy', NEWLINE+'dummy'+NEWLINE+'====='+NEWLINE),
+        (RstGenerator, 'h3', 'h3', NEWLINE+'h3'+NEWLINE+'~~'+NEWLINE),
+        (RstGenerator, 'paragraph', 'dummy', NEWLINE+'dummy'+NEWLINE+NEWLINE),
+        (RstGenerator, 'codeparagraph', 'dummy', NEWLINE+'::'+NEWLINE+NEWLINE+'    dummy'+NEWLINE+NEWLINE),
 ])
 def test_basic_elements(MdGenerator, method_name, text, exp_result):
     """Test correctness of simple methods returning string."""
@@ -67,6 +75,65 @@ def test_table_manual(MdGenerator, exp_result):
     assert exp_result == generator.render_section()
 
 
+@pytest.mark.parametrize("backend, exp_result", [
+        (PandocMdGenerator,
+         '+-+-+' + NEWLINE +
+         '|a|b|' + NEWLINE +
+         '+=+=+' + NEWLINE +
+         '|1|2|' + NEWLINE +
+         '+-+-+' + NEWLINE
+        ),
+        (GithubMdGenerator,
+         '| a | b |' + NEWLINE +
+         '|---|---|' + NEWLINE +
+         '| 1 | 2 |' + NEWLINE
+        ),
+        (RstGenerator,
+         '+---+---+' + NEWLINE +
+         '| a | b |' + NEWLINE +
+         '+===+===+' + NEWLINE +
+         '| 1 | 2 |' + NEWLINE +
+         '+---+---+' + NEWLINE
+        ),
+])
+def test_as_backend(backend, exp_result):
+    """Test rendering the same contents with multiple backends."""
+    generator = PandocMdGenerator()
+    generator.add_header(['a', 'b'])
+    generator.add_row([1, 2])
+    generator.add_table_to_section()
+    view = generator.as_backend(backend)
+    assert exp_result == view.render_section()
+
+    # contents are shared, not copied
+    generator.add_row([3, 4])
+    assert view.render_table().count('3') == 1
+
+
+def test_codeparagraph_language():
+    """Test code language is kept as an element attribute."""
+    generator = PandocMdGenerator()
+    generator.codeparagraph('x = 1', language='python')
+    assert generator.render_block().startswith('~~~~~~ {.python}' + NEWLINE)
+    assert generator.as_backend(GithubMdGenerator).render_block().startswith('```python' + NEWLINE)
+    assert '.. code-block:: python' in generator.as_backend(RstGenerator).render_block()
+
+
+def test_pipe_table_escaping():
+    """Test pipes within cells are escaped and counted in the widths."""
+    generator = GithubMdGenerator()
+    generator.add_header(['a', 'b|c'])
+    generator.add_row([1, 'x|y'])
+    generator.add_row([2, 'z'])
+    exp_result = (
+        '| a | b\\|c |' + NEWLINE +
+        '|---|------|' + NEWLINE +
+        '| 1 | x\\|y |' + NEWLINE +
+        '| 2 | z    |' + NEWLINE)
+    assert exp_result == generator.render_table()
+    assert exp_result == ''.join(generator._iter_table())
+
+
 @pytest.mark.parametrize("MdGenerator", [
         (PandocMdGenerator)
 ])
@@ -113,4 +180,675 @@ def test_workflow_pandas(MdGenerator):
     generator.add_block_to_section(block_name="pandas", section_name="example_section")
     generator.add_table_to_section(table_name="cars", section_name="example_section")
     md_text = generator.render_section(section_name="example_section")
-    assert len(md_text)>0
\ No newline at end of file
+    assert len(md_text)>0
+
+def test_write_document_incremental(tmp_path):
+    """Test unchanged documents are not written again."""
+    path = tmp_path / 'report.md'
+    generator = PandocMdGenerator()
+    generator.h1('Report', block_name='intro')
+    generator.add_block_to_section(block_name='intro', section_name='intro')
+    generator.add_header(['a', 'b'], table_name='data')
+    generator.add_row([1, 2], table_name='data')
+    generator.add_table_to_section(table_name='data', section_name='data')
+
+    assert generator.write_document(path)
+    assert path.read_text() == str(generator)
+    assert (tmp_path / 'report.md.manifest.json').exists()
+
+    # nothing changed, neither rendered nor written again
+    rendered = []
+    render_section = generator._render_section
+    generator._render_section = lambda section: rendered.append(section) or render_section(section)
+    assert not generator.write_document(path)
+    assert rendered == []
+
+    # only the modified section is rendered again
+    generator.add_row([3, 4], table_name='data')
+    assert generator.write_document(path)
+    assert len(rendered) == 1
+    assert path.read_text() == str(generator)
+
+    # a fresh generator with the same contents does not rewrite the file
+    assert not generator.as_backend(PandocMdGenerator).write_document(path)
+    assert generator.write_document(path, incremental=False)
+
+    # a different encoding rewrites the file
+    generator.paragraph('déjà vu', block_name='intro')
+    assert generator.write_document(path)
+    assert generator.write_document(path, encoding='latin-1')
+    assert path.read_bytes().decode('latin-1') == str(generator)
+    assert not generator.write_document(path, encoding='latin-1')
+
+    # clearing the generator drops the rendered sections it cached
+    generator.clear()
+    assert generator._rendered_sections == {}
+
+
+def test_thread_safe_producers():
+    """Test concurrent producers appending to the same table and block."""
+    import threading
+
+    generator = PandocMdGenerator(thread_safe=True)
+    generator.add_header(['thread', 'row'], table_name='rows')
+
+    def produce(thread_id):
+        for i in range(500):
+            generator.add_row([thread_id, 'x' * (i % 7)], table_name='rows')
+            generator.paragraph(str(i), block_name=thread_id % 2)
+
+    threads = [threading.Thread(target=produce, args=(t,)) for t in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    table = generator._tables['rows']
+    assert table['rows_count'] == len(table['rows']) == 8 * 500
+    assert table['cols_widths'] == [6, 6]
+    assert len(generator._blocks[0]) + len(generator._blocks[1]) == 8 * 500
+
+
+TABLE_AB = (
+    '+-+---+' + NEWLINE +
+    '|a|b  |' + NEWLINE +
+    '+=+===+' + NEWLINE +
+    '|1|x  |' + NEWLINE +
+    '+-+---+' + NEWLINE +
+    '|3|yyy|' + NEWLINE +
+    '+-+---+' + NEWLINE
+)
+
+
+@pytest.mark.parametrize("records, columns", [
+        ([(1, 'x'), (3, 'yyy')], ['a', 'b']),
+        ([{'a': 1, 'b': 'x'}, {'b': 'yyy', 'a': 3}], None),
+        (iter([[1, 'x'], [3, 'yyy']]), ('a', 'b')),
+])
+def test_from_records(records, columns):
+    """Test ingestion of records."""
+    generator = PandocMdGenerator()
+    generator.from_records(records, columns)
+    assert TABLE_AB == generator.render_table()
+
+
+def test_from_numpy():
+    """Test ingestion of numpy structured arrays."""
+    import numpy as np
+
+    array = np.array([(1, 'x'), (3, 'yyy')], dtype=[('a', 'i4'), ('b', 'U3')])
+    generator = PandocMdGenerator()
+    generator.from_numpy(array)
+    assert TABLE_AB == generator.render_table()
+
+    with pytest.raises(TypeError):
+        generator.from_numpy(np.arange(3), table_name='plain')
+
+    # cells are stringified the same way as by from_records
+    array = np.array([(b'ab', 0.1)], dtype=[('a', 'S2'), ('b', 'f4')])
+    generator.from_numpy(array, table_name='scalars')
+    generator.from_records(array.tolist(), ['a', 'b'], table_name='records')
+    assert generator.render_table(table_name='scalars') == generator.render_table(table_name='records')
+
+    with pytest.raises(ValueError):
+        generator.from_numpy(np.zeros(2, dtype=[('a', 'i4', (2,))]), table_name='subarray')
+
+
+def test_from_arrow():
+    """Test ingestion of Arrow tables."""
+    pa = pytest.importorskip('pyarrow')
+
+    data = pa.table({'a': [1, 3], 'b': ['x', 'yyy']})
+    generator = PandocMdGenerator()
+    generator.from_arrow(data)
+    assert TABLE_AB == generator.render_table()
+    generator.from_arrow(data.to_batches()[0], table_name='batch')
+    assert TABLE_AB == generator.render_table(table_name='batch')
+
+
+def test_string_column():
+    """Test null and multi-line cells of the column-wise adapters."""
+    from markdgenerator.adapters import _string_column
+
+    assert _string_column(['a', None, 'bb']) == (['a', 'None', 'bb'], 4, False)
+    assert _string_column(['a', 'x\nyyy', None]) == (['a', ('x', 'yyy'), 'None'], 4, True)
+    assert _string_column([]) == ([], 0, False)
+
+
+def test_from_cursor():
+    """Test ingestion of DB-API cursors in batches."""
+    import sqlite3
+
+    connection = sqlite3.connect(':memory:')
+    connection.execute('create table t (a integer, b text)')
+    connection.executemany('insert into t values (?, ?)', [(1, 'x'), (3, 'yyy')])
+    cursor = connection.execute('select a, b from t order by a')
+
+    generator = PandocMdGenerator()
+    generator.from_cursor(cursor, batch_size=1)
+    assert TABLE_AB == generator.render_table()
+
+    # table names are not reused
+    with pytest.raises(ValueError):
+        generator.from_records([(1, 2)])
+
+
+def test_df_to_grouped_tables():
+    """Test one heading and table per group, matching the groupby loop."""
+    df = pd.DataFrame(
+        columns=['brand', 'model', 'price'],
+        data=[['vw', 'golf', 10000], ['bmw', 'x5', 50000], ['vw', 'up', 9000], ['bmw', 'i3 ', 35000]])
+
+    expected = PandocMdGenerator()
+    for key, g in df.groupby('brand'):
+        expected.h2(key, block_name=key)
+        expected.add_block_to_section(block_name=key)
+        expected.df_to_table(g, table_name=key)
+        expected.add_table_to_section(table_name=key)
+
+    generator = PandocMdGenerator()
+    generator.df_to_grouped_tables(df, 'brand')
+    assert str(expected) == str(generator)
+    assert generator._tables['bmw']['cols_widths'] == [5, 5, 5]
+
+    generator.df_to_grouped_tables(df, ['brand', 'model'], heading_level=3, section_name='models')
+    assert '### vw, golf' in generator.render_section('models')
+
+    with pytest.raises(ValueError):
+        generator.df_to_grouped_tables(df, 'brand', section_name='again')
+
+    # keys are named the way df.groupby yields them, 1-tuples for a list of a single column
+    generator.df_to_grouped_tables(df, ['brand'], section_name='tuples')
+    assert [('bmw',), ('vw',)] == [k for k, _ in df.groupby(['brand'])]
+    assert ('bmw',) in generator._tables and ('vw',) in generator._tables
+
+    # unused categories have no group
+    df['brand'] = pd.Categorical(df['brand'], categories=['audi', 'bmw', 'vw'])
+    generator = PandocMdGenerator()
+    generator.df_to_grouped_tables(df, 'brand')
+    assert str(expected) == str(generator)
+
+
+@pytest.mark.parametrize("backend", [
+        (PandocMdGenerator),
+        (GithubMdGenerator),
+        (RstGenerator)
+])
+def test_memory_usage(backend):
+    """Test memory accounting and rendered size estimates."""
+    generator = backend()
+    generator.h1('Report')
+    generator.add_block_to_section()
+    generator.add_header(['name', 'surname'])
+    generator.add_row(['john', 'travolta'])
+    generator.add_row(['will', 'smith'])
+    generator.add_table_to_section()
+
+    usage = generator.memory_usage()
+    assert set(usage['tables'][None]) == {'header', 'rows', 'widths', 'rendered'}
+    assert usage['tables'][None]['rendered'] == len(generator.render_table())
+    assert usage['blocks'][None] > 0 and usage['sections'][None] > 0
+    assert usage['total'] > generator.memory_usage(deep=False)['total']
+
+
+@pytest.mark.parametrize("backend", [
+        (PandocMdGenerator),
+        (RstGenerator),
+])
+def test_memory_usage_multiline(backend):
+    """Test rendered size estimates of grid tables with multi-line rows."""
+    generator = backend()
+    generator.add_header(['name', 'sur\nname'])
+    generator.add_row(['john', 'travolta\nx'])
+    generator.add_row(['will', 'smith'])
+    generator.from_records([['a\nb\nc', 'd']], ['x', 'y'], table_name='records')
+
+    def check():
+        for name in (None, 'records'):
+            assert generator.memory_usage()['tables'][name]['rendered'] == len(generator.render_table(name))
+
+    check()
+    generator.set_cell(1, 0, 'w\ni\nl\nl')
+    check()
+    generator.update_row(0, ['john', 'travolta'])
+    check()
+    generator.delete_row(1)
+    check()
+
+
+def test_memory_budget():
+    """Test the memory budget raises or spills before it is crossed."""
+    generator = PandocMdGenerator()
+    generator.set_memory_budget(generator.memory_usage()['total'] + 2000)
+    with pytest.raises(MemoryError):
+        for i in range(100):
+            generator.add_row(['row', i])
+    assert generator.memory_usage()['total'] <= 2000
+
+    spilled = []
+    def spill(generator, nbytes):
+        spilled.append(generator.render_table())
+        generator.clear()
+
+    generator.set_memory_budget(2000, on_exceed=spill)
+    for i in range(100):
+        generator.add_row(['row', i])
+    assert len(spilled) > 0
+    assert generator.memory_usage()['total'] <= 2000
+
+    # failed additions give their reservation back
+    generator = PandocMdGenerator()
+    generator.add_header(['a', 'b'])
+    generator.set_memory_budget(2000)
+    with pytest.raises(IndexError):
+        generator.update_row(5, ['x', 'y'])
+    # the counts of cells by length built by the first edit are charged
+    assert generator._memory_budget['used'] == generator.memory_usage()['total']
+    used = generator._memory_budget['used']
+    for i in range(100):
+        with pytest.raises(ValueError):
+            generator.add_row(['x'])
+        with pytest.raises(IndexError):
+            generator.update_row(5, ['x', 'y'])
+    assert generator._memory_budget['used'] == used
+
+    # edits and section components are charged too
+    generator = PandocMdGenerator()
+    generator.add_header(['a', 'b'])
+    generator.set_memory_budget(2000)
+    generator.add_row(['x', 'y'])
+    with pytest.raises(MemoryError):
+        generator.set_cell(0, 0, 'z'*5000)
+    with pytest.raises(MemoryError):
+        for i in range(100):
+            generator.add_table_to_section(section_name=i)
+    assert generator.memory_usage()['total'] <= 2000
+
+
+def test_memory_budget_concurrent_edits():
+    """Test first edits and spilling additions do not deadlock."""
+    import sys
+    import threading
+
+    generator = PandocMdGenerator(thread_safe=True)
+    spill_lock = threading.Lock()
+    spilled = []
+    def spill(generator, nbytes):
+        with spill_lock:
+            spilled.append(str(generator))
+            generator.clear()
+
+    generator.set_memory_budget(generator.memory_usage()['total'] + 1500, on_exceed=spill)
+
+    errors = []
+    def produce(thread_id):
+        for i in range(300):
+            try:
+                generator.add_row([thread_id, i], table_name=thread_id % 2)
+                # the first edit of a table builds and charges its counts of cells by length
+                generator.update_row(0, [thread_id, 'x' * (i % 5)], table_name=thread_id % 2)
+            except (ValueError, IndexError, MemoryError):
+                # cleared meanwhile, or the budget filled again by other threads
+                pass
+            except Exception as e:
+                errors.append(e)
+
+    # switch threads often, for the locks to be contended
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=produce, args=(t,), daemon=True) for t in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=60)
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert not any([t.is_alive() for t in threads])
+    assert errors == []
+    assert len(spilled) > 0
+
+
+def test_memory_budget_spill_unlocked():
+    """Test the spill function is called without the budget lock held."""
+    import threading
+
+    generator = PandocMdGenerator(thread_safe=True)
+    generator.set_memory_budget(generator.memory_usage()['total'] + 2000)
+    lock_free = []
+    def spill(generator, nbytes):
+        # another thread must be able to take the budget lock meanwhile
+        budget_lock = generator._lock("budget", None)
+        acquired = []
+        def try_lock():
+            acquired.append(budget_lock.acquire(timeout=5))
+            if acquired[0]:
+                budget_lock.release()
+        thread = threading.Thread(target=try_lock)
+        thread.start()
+        thread.join()
+        lock_free.append(acquired[0])
+        generator.clear()
+
+    generator.set_memory_budget(2000, on_exceed=spill)
+    for i in range(100):
+        generator.add_row(['row', i])
+    assert lock_free and all(lock_free)
+    assert generator.memory_usage()['total'] <= 2000
+
+
+@pytest.mark.parametrize("backend", [
+        (PandocMdGenerator),
+        (GithubMdGenerator),
+        (RstGenerator)
+])
+@pytest.mark.parametrize("thread_safe", [False, True])
+def test_render_to(backend, thread_safe):
+    """Test streamed rendering equals the string representation."""
+    import io
+
+    generator = backend(thread_safe=thread_safe)
+    for content in ('tables', 'blocks', 'sections'):
+        if content == 'blocks':
+            generator.h1('Report', block_name='intro')
+            generator.paragraph('Text', block_name='outro')
+        if content == 'sections':
+            generator.add_block_to_section(block_name='intro')
+            generator.add_table_to_section(table_name='t')
+            generator.add_block_to_section(block_name='outro', section_name='end')
+        else:
+            generator.add_header(['x', 'y'], table_name=content[0])
+            generator.add_row([1, 'long value'], table_name=content[0])
+
+        stream = io.StringIO()
+        generator.render_to(stream)
+        assert str(generator) == stream.getvalue()
+
+
+@pytest.mark.parametrize("sink_class, module_name", [
+        ('GzipSink', 'gzip'),
+        ('Bz2Sink', 'bz2'),
+        ('LzmaSink', 'lzma'),
+])
+def test_compressed_sinks(tmp_path, sink_class, module_name):
+    """Test incremental compression of rendered documents."""
+    import importlib
+    import markdgenerator
+
+    generator = PandocMdGenerator()
+    generator.h1('Archive')
+    generator.add_block_to_section()
+    for i in range(2000):
+        generator.add_row([i, 'value {}'.format(i)])
+    generator.add_table_to_section()
+
+    path = tmp_path / 'report.md.z'
+    with getattr(markdgenerator, sink_class)(path, level=1, chunk_size=4096) as sink:
+        generator.render_to(sink)
+
+    expected = str(generator).encode('utf-8')
+    assert sink.raw_bytes == len(expected)
+    assert sink.compressed_bytes == path.stat().st_size < len(expected)
+    with importlib.import_module(module_name).open(path) as fp:
+        assert fp.read() == expected
+
+    # invalid levels fail before the file is created
+    path = tmp_path / 'invalid.z'
+    with pytest.raises(Exception):
+        getattr(markdgenerator, sink_class)(path, level=42)
+    assert not path.exists()
+
+
+def test_render_to_does_not_block_producers():
+    """Test a slow consumer of a table does not hold its lock."""
+    import threading
+
+    generator = PandocMdGenerator(thread_safe=True)
+    generator.add_header(['a', 'b'])
+    for i in range(10):
+        generator.add_row([i, i])
+
+    before = generator.render_table()
+    lines = generator._iter_table()
+    first = next(lines)
+    producer = threading.Thread(target=lambda: (generator.add_row([10, 10]), generator.set_cell(0, 0, 'xx')))
+    producer.start()
+    producer.join(timeout=5)
+    assert not producer.is_alive()
+
+    # the stream renders the table as it was when it started
+    assert before == first + ''.join(lines)
+    assert '|xx|' in generator.render_table()
+
+
+def test_table_edits():
+    """Test row and cell edits keep the column widths exact."""
+    generator = PandocMdGenerator()
+    generator.add_header(['a', 'b'])
+    generator.add_row(['x', 'yyy'])
+    generator.add_row(['zzzz', 'y'])
+    generator.add_row(['x', 'yy'])
+
+    generator.delete_row(1)
+    assert generator._tables[None]['cols_widths'] == [1, 3]
+    assert generator._tables[None]['rows_count'] == 2
+
+    generator.update_row(0, ['xx', 'y'])
+    assert generator._tables[None]['cols_widths'] == [2, 2]
+
+    generator.set_cell(-1, 1, 'longest')
+    generator.set_cell(0, 0, '')
+    assert generator._tables[None]['cols_widths'] == [1, 7]
+
+    generator.add_row(['wide', 1])
+    generator.set_cell(-1, 0, 1)
+    assert generator.render_table() == (
+        '+-+-------+' + NEWLINE +
+        '|a|b      |' + NEWLINE +
+        '+=+=======+' + NEWLINE +
+        '| |y      |' + NEWLINE +
+        '+-+-------+' + NEWLINE +
+        '|x|longest|' + NEWLINE +
+        '+-+-------+' + NEWLINE +
+        '|1|1      |' + NEWLINE +
+        '+-+-------+' + NEWLINE)
+
+    with pytest.raises(ValueError):
+        generator.update_row(0, ['too', 'many', 'cells'])
+    with pytest.raises(IndexError):
+        generator.delete_row(10)
+    with pytest.raises(ValueError):
+        generator.set_cell(0, 0, 'x', table_name='missing')
+
+
+def test_table_edits_wide_cells():
+    """Test shrinking a very wide column does not depend on its width."""
+    generator = PandocMdGenerator()
+    generator.add_header(['a', 'b'])
+    for i in range(100):
+        generator.add_row([i, 'x' * (i % 10)])
+
+    # a shrink pops the stale lengths of the heap, never scans the widths
+    wide = 'y' * 200000
+    for i in range(2000):
+        generator.set_cell(0, 0, wide)
+        assert generator._tables[None]['cols_widths'] == [200000, 9]
+        generator.set_cell(0, 0, 'x')
+        assert generator._tables[None]['cols_widths'] == [2, 9]
+        heap, counts = generator._tables[None]['widths_heaps'][0], generator._tables[None]['widths_counts'][0]
+        assert len(heap) <= 2*len(counts) + 1
+    for i in range(2000):
+        generator.update_row(1, [wide, 'x'])
+        generator.update_row(1, ['1', 'x'])
+        assert len(heap) <= 2*len(counts) + 1
+    assert generator._tables[None]['cols_widths'] == [2, 9]
+    assert -heap[0] == max(counts) == 2
+
+    # stale lengths do not accumulate in the heaps
+    for i in range(2000):
+        generator.set_cell(i % 100, 1, 'z' * (i % 50))
+    assert generator._tables[None]['cols_widths'] == [2, 49]
+    heap, counts = generator._tables[None]['widths_heaps'][1], generator._tables[None]['widths_counts'][1]
+    assert len(heap) <= 2*len(counts) + 1
+    assert -heap[0] == max(counts)
+
+
+def _snapshot_generator():
+    """Create a generator with sections, an orphan block and tuple names."""
+    generator = PandocMdGenerator()
+    generator.h1('Report', block_name='intro')
+    generator.paragraph('Žluťoučký kůň', block_name='intro')
+    generator.add_block_to_section(block_name='intro')
+    generator.add_header(['a', 'b'], table_name=('data', 1))
+    generator.add_row([1, 'x'], table_name=('data', 1))
+    generator.add_table_to_section(table_name=('data', 1))
+    generator.add_block_to_section(block_name='intro', section_name='again')
+    generator.h2('Not in a section', block_name='orphan')
+    return generator
+
+
+def _check_snapshot(snapshot, generator):
+    """Check all slices of a snapshot against the generator."""
+    assert str(snapshot) == str(generator)
+    assert snapshot.render_section() == generator.render_section()
+    assert snapshot.render_section('again') == generator.render_section('again')
+    assert snapshot.render_table(('data', 1)) == generator.render_table(('data', 1))
+    assert snapshot.render_block('orphan') == generator.render_block('orphan')
+    assert snapshot.view('block', 'intro').readonly
+
+
+def test_freeze(tmp_path):
+    """Test snapshots in memory, memory-mapped and in shared memory."""
+    from markdgenerator import DocumentSnapshot
+
+    generator = _snapshot_generator()
+    snapshot = generator.freeze()
+    _check_snapshot(snapshot, generator)
+    _check_snapshot(DocumentSnapshot.from_buffer(snapshot.to_bytes()), generator)
+
+    path = tmp_path / 'report.snapshot'
+    snapshot.to_file(path)
+    with DocumentSnapshot.open(path) as mapped:
+        _check_snapshot(mapped, generator)
+
+    shm = snapshot.to_shared_memory()
+    try:
+        with DocumentSnapshot.from_shared_memory(shm.name) as attached:
+            _check_snapshot(attached, generator)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    with pytest.raises(KeyError):
+        snapshot.render_section('missing')
+
+    # names are restored with their types
+    generator.add_row([2, 'y'], table_name=3)
+    restored = DocumentSnapshot.from_buffer(generator.freeze().to_bytes())
+    assert restored.render_table(3) == generator.render_table(3)
+    assert restored.names('table') == [('data', 1), 3]
+
+
+def test_freeze_names_round_trip():
+    """Test names of datetime groupbys and numpy scalars are restored with their types."""
+    import datetime
+    import numpy as np
+    from markdgenerator import DocumentSnapshot
+
+    df = pd.DataFrame({'day': pd.to_datetime(['2020-01-01', '2020-01-02']), 'value': [1, 2]})
+    generator = PandocMdGenerator()
+    generator.df_to_grouped_tables(df, 'day')
+    names = [pd.Timestamp('2020-01-01 10:00', tz='Europe/Prague'), datetime.date(2020, 1, 3),
+             np.int32(7), np.float64(0.5), np.bool_(True), np.datetime64('2020-01-04T05:06:07.000000001'),
+             (np.int64(1), 'x')]
+    for name in names:
+        generator.add_row([1, 2], table_name=name)
+
+    restored = DocumentSnapshot.from_buffer(generator.freeze().to_bytes())
+    restored_names = restored.names('table')
+    assert restored_names == list(generator._tables)
+    for name, restored_name in zip(generator._tables, restored_names):
+        assert type(restored_name) is type(name)
+        assert restored.render_table(restored_name) == generator.render_table(name)
+    assert restored.names('block') == list(generator._blocks)
+    added = restored_names[2:]
+    assert str(added[0].tz) == 'Europe/Prague'
+    assert added[5].dtype == np.dtype('datetime64[ns]')
+    assert type(added[6][0]) is np.int64
+
+    # other objects cannot be restored from the index
+    generator.add_row([1, 2], table_name=object())
+    with pytest.raises(TypeError, match='object'):
+        generator.freeze()
+
+
+MULTILINE_TABLE = (
+    '+----+---+' + NEWLINE +
+    '|a   |b  |' + NEWLINE +
+    '|    |cc |' + NEWLINE +
+    '+====+===+' + NEWLINE +
+    '|1   |x  |' + NEWLINE +
+    '+----+---+' + NEWLINE +
+    '|line|yyy|' + NEWLINE +
+    '|two |   |' + NEWLINE +
+    '|    |   |' + NEWLINE +
+    '+----+---+' + NEWLINE
+)
+
+
+def test_multiline_cells():
+    """Test multi-line cells in grid tables."""
+    generator = PandocMdGenerator()
+    generator.add_header(['a', 'b\ncc'])
+    generator.add_row([1, 'x'])
+    generator.add_row(['line\r\ntwo\n', 'yyy'])
+    assert MULTILINE_TABLE == generator.render_table()
+    assert generator.as_backend(GithubMdGenerator).render_table().splitlines()[-1] == '| line<br>two<br> | yyy     |'
+    assert generator.as_backend(RstGenerator).render_table().splitlines()[2] == '|      | cc  |'
+
+    # widths follow the longest lines when cells are edited
+    generator.set_cell(1, 0, 'a\nb')
+    assert generator._tables[None]['cols_widths'] == [1, 3]
+    generator.update_row(0, ['1', 'x\nlonger'])
+    assert generator._tables[None]['cols_widths'] == [1, 6]
+
+
+@pytest.mark.parametrize("replace_newlines, exp_result", [
+        (False,
+         '+----+---+' + NEWLINE +
+         '|a   |b  |' + NEWLINE +
+         '|    |cc |' + NEWLINE +
+         '+====+===+' + NEWLINE +
+         '|1   |x  |' + NEWLINE +
+         '+----+---+' + NEWLINE +
+         '|line|yyy|' + NEWLINE +
+         '|two |   |' + NEWLINE +
+         '+----+---+' + NEWLINE
+        ),
+        (True,
+         '+----------+-----+' + NEWLINE +
+         '|a         |b; cc|' + NEWLINE +
+         '+==========+=====+' + NEWLINE +
+         '|1         |x    |' + NEWLINE +
+         '+----------+-----+' + NEWLINE +
+         '|line; two;|yyy  |' + NEWLINE +
+         '+----------+-----+' + NEWLINE
+        ),
+])
+def test_df_to_table_multiline(replace_newlines, exp_result):
+    """Test newlines in dataframes become multi-line cells or are replaced."""
+    df = pd.DataFrame(columns=['a', 'b\ncc'], data=[[1, 'x'], ['line\r\ntwo\n', 'yyy']])
+    generator = PandocMdGenerator()
+    generator.df_to_table(df, replace_newlines=replace_newlines)
+    assert exp_result == generator.render_table()
+
+
+def test_from_numpy_multiline():
+    """Test multi-line cells of adapters are split column-wise."""
+    import numpy as np
+
+    array = np.array([(1, 'x'), (3, 'y\nzz')], dtype=[('a', 'i4'), ('b', 'U4')])
+    generator = PandocMdGenerator()
+    generator.from_numpy(array)
+    assert generator._tables[None]['cols_widths'] == [1, 2]
+    assert generator.render_table().splitlines()[-3:-1] == ['|3|y |', '| |zz|']